@@ -0,0 +1,121 @@
+"""
+Shared API access for the Streamlit pages: the HTTP session, error display,
+ETag-aware lookup table fetching and the bulk-save helpers. Keeping these in one module
+means every page shares the same session and the same st.cache_data entries.
+"""
+import os
+import streamlit as st
+import pandas as pd
+import requests
+import orjson
+from pandas.util import hash_pandas_object
+from requests.adapters import HTTPAdapter
+
+# --- API Configuration ---
+API_URL = "http://127.0.0.1:8000"
+
+# Read lookup tables straight from the database (see local_api). Imported only
+# when set, so the pages don't load the API's database stack otherwise.
+IN_PROCESS_READS = os.getenv("FX_API_IN_PROCESS", "") == "1"
+if IN_PROCESS_READS:
+    import local_api
+API_TIMEOUT = 10 # Seconds, applied to every request that doesn't set its own
+
+# Seconds before a cached lookup table is revalidated. Short, since an unchanged
+# table only costs a 304 and pages then see other users' edits quickly.
+LOOKUP_TTL = 5
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies API_TIMEOUT unless a request passes a timeout."""
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = API_TIMEOUT
+        return super().send(request, **kwargs)
+
+@st.cache_resource(show_spinner=False)
+def get_api_session():
+    """Returns a keep-alive HTTP session shared across Streamlit reruns."""
+    session = requests.Session()
+    session.headers["Connection"] = "keep-alive"
+    session.mount("http://", TimeoutHTTPAdapter(pool_connections=4, pool_maxsize=20))
+    return session
+
+SESSION = get_api_session()
+
+# --- API Helper Functions ---
+
+def handle_api_error(response, context="action"):
+    """Helper to display API errors in Streamlit."""
+    try:
+        detail = response.json().get("detail", response.text)
+    except requests.exceptions.JSONDecodeError:
+        detail = response.text
+    st.error(f"Failed to {context}: {response.status_code} - {detail}")
+
+# --- Conditional GET Store ---
+
+@st.cache_resource(show_spinner=False)
+def get_lookup_etags():
+    """Returns the (endpoint, date_columns) -> (ETag, DataFrame) store for conditional GETs."""
+    return {}
+
+_lookup_etags = get_lookup_etags()
+
+def _lookup_frame(rows, date_columns):
+    """Builds a lookup DataFrame, parsing the API's YYYY-MM-DD strings in date_columns."""
+    df = pd.DataFrame(rows)
+    if not df.empty:
+        for col in date_columns:
+            df[col] = pd.to_datetime(df[col])
+    return df
+
+@st.cache_data(ttl=LOOKUP_TTL) # Mutations also clear the cache explicitly
+def fetch_lookup_tables(endpoint_name, date_columns=()):
+    """Fetches clients, work_type, etc. from the API, revalidating with the last ETag."""
+    if IN_PROCESS_READS:
+        try:
+            return _lookup_frame(local_api.list_rows(endpoint_name), date_columns)
+        except local_api.ERRORS as e:
+            st.error(f"Error fetching {endpoint_name}: {e}")
+            return pd.DataFrame()
+    store_key = (endpoint_name, date_columns)
+    try:
+        etag, cached_df = _lookup_etags.get(store_key, (None, None))
+        headers = {"If-None-Match": etag} if etag else {}
+        response = SESSION.get(f"{API_URL}/{endpoint_name}/", headers=headers)
+        if response.status_code == 304:
+            return cached_df
+        response.raise_for_status()
+        df = _lookup_frame(orjson.loads(response.content), date_columns)
+        if "ETag" in response.headers:
+            _lookup_etags[store_key] = (response.headers["ETag"], df)
+        return df
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+        st.error(f"Error fetching {endpoint_name}: {e}")
+        return pd.DataFrame()
+
+def frames_unchanged(original, edited):
+    """Fast check, via per-row hashes, that the data editor returned the frame untouched."""
+    return original.shape == edited.shape and hash_pandas_object(original).equals(hash_pandas_object(edited))
+
+def rows_by_id(df):
+    """Maps each index id to its row as a tuple of plain Python values."""
+    return dict(zip(df.index.tolist(), map(tuple, df.to_numpy().tolist())))
+
+def save_bulk(endpoint, updates, deletes, context):
+    """Sends updates and deletions in one bulk request; returns the (updated, deleted) counts."""
+    if not updates and not deletes:
+        return 0, 0
+    try:
+        # orjson encodes any numpy scalars left in the rows natively
+        body = orjson.dumps({"updates": updates, "deletes": deletes}, option=orjson.OPT_SERIALIZE_NUMPY)
+        response = SESSION.post(
+            f"{API_URL}/{endpoint}/bulk", data=body, headers={"Content-Type": "application/json"}
+        )
+        if response.status_code == 200:
+            result = response.json()
+            return result["updated"], result["deleted"]
+        handle_api_error(response, context)
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error: {e}")
+    return 0, 0
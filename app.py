@@ -1,10 +1,14 @@
 import streamlit as st
 import pandas as pd
 import requests
+import orjson
 import datetime
+from concurrent.futures import ThreadPoolExecutor
+from api_client import API_URL, SESSION, handle_api_error, fetch_lookup_tables
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
-# --- API Configuration ---
-API_URL = "http://127.0.0.1:8000"
+# --- Forecast Table Paging ---
+PAGE_SIZES = [50, 200, 1000]
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -15,75 +19,149 @@ st.set_page_config(
 
 # --- API Helper Functions ---
 
-def handle_api_error(response, context="action"):
-    """Helper to display API errors in Streamlit."""
-    try:
-        detail = response.json().get("detail", response.text)
-    except requests.exceptions.JSONDecodeError:
-        detail = response.text
-    st.error(f"Failed to {context}: {response.status_code} - {detail}")
-
 @st.cache_data(ttl=300)  # Cache for 5 minutes
-def fetch_all_forecasts():
-    """Fetches all forecasts from the API."""
+def fetch_all_forecasts(after=None, limit=PAGE_SIZES[0], client_id=None):
+    """
+    Fetches one page of forecasts from the API, optionally for a single client.
+    `after` is the cursor of the last row on the previous page (see forecast_cursor).
+    """
+    params = {"limit": limit}
+    if client_id is not None:
+        params["client_id"] = client_id
+    if after is not None:
+        vertical, unit, client, work_type, dt, forecast_id = after
+        params.update({
+            "after_vertical": vertical,
+            "after_unit": unit,
+            "after_client": client,
+            "after_work_type": work_type,
+            "after_dt": dt.isoformat(),
+            "after_id": forecast_id
+        })
     try:
-        response = requests.get(f"{API_URL}/forecasts/")
+        response = SESSION.get(f"{API_URL}/forecasts/", params=params)
         response.raise_for_status()  # Raise an exception for bad status codes
-        data = response.json()
-        df = pd.DataFrame(data)
+        data = orjson.loads(response.content)
+        # Arrow-backed dtypes keep the string columns in contiguous buffers
+        df = pd.DataFrame(data).convert_dtypes(dtype_backend="pyarrow")
         if not df.empty:
-            df['dt'] = pd.to_datetime(df['dt']).dt.date
+            df['dt'] = pd.to_datetime(df['dt']) # DateColumn renders datetimes directly
         return df
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         st.error(f"Error fetching forecasts: {e}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600) # Cache lookups for 10 mins
-def fetch_lookup_tables(endpoint_name):
-    """Fetches clients, work_type, etc. from the API."""
+@st.cache_data(ttl=300)
+def fetch_forecast_stats():
+    """Fetches pre-aggregated forecast totals from the API."""
     try:
-        response = requests.get(f"{API_URL}/{endpoint_name}/")
+        response = SESSION.get(f"{API_URL}/forecasts/stats/")
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         return pd.DataFrame(data)
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error fetching {endpoint_name}: {e}")
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+        st.error(f"Error fetching forecast stats: {e}")
         return pd.DataFrame()
 
+def clear_forecast_caches():
+    """Invalidates only the cached forecast data after a forecast is changed."""
+    fetch_all_forecasts.clear()
+    fetch_forecast_stats.clear()
+
+@st.cache_data(show_spinner=False)
+def build_option_map(df, name_col, id_col):
+    """Builds a name -> id map and its sorted option list for a select box."""
+    if df.empty:
+        return {}, []
+    option_map = dict(zip(df[name_col].tolist(), df[id_col].tolist()))
+    return option_map, sorted(option_map)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def api_alive():
+    """Checks that the API is reachable, at most twice a minute."""
+    try:
+        return SESSION.head(f"{API_URL}/healthz", timeout=1).ok
+    except requests.exceptions.RequestException:
+        return False
+
+def forecast_cursor(row):
+    """Builds the keyset pagination cursor (the API's sort key) for a forecast row."""
+    return (
+        row['business_vertical_name'], row['business_unit_name'], row['client_name'],
+        row['work_type_name'], row['dt'].date(), int(row['forecast_id'])
+    )
+
+def reset_forecast_page():
+    """Jumps back to the first page when the table filter or page size changes."""
+    st.session_state.forecast_cursors = [None]
+
+def next_forecast_page(cursor):
+    """Moves to the page after the given cursor."""
+    st.session_state.forecast_cursors.append(cursor)
+
+def previous_forecast_page():
+    """Moves back to the previously visited page."""
+    if len(st.session_state.forecast_cursors) > 1:
+        st.session_state.forecast_cursors.pop()
+
 # --- Main Application ---
 def main():
     st.title("📊 Client Work Forecast Dashboard")
     
     # Check if API is running
-    try:
-        requests.get(f"{API_URL}/docs")
-    except requests.exceptions.ConnectionError:
+    if not api_alive():
+        api_alive.clear() # Re-check on the next rerun instead of caching the outage
         st.error(f"Could not connect to the API at {API_URL}.")
-        st.info("Please ensure the FastAPI server is running: uvicorn main:app --reload")
+        st.info("Please ensure the FastAPI server is running: uvicorn fx_api:app --reload")
         st.stop()
 
     # --- Load Data ---
-    df_forecasts = fetch_all_forecasts()
-    df_clients = fetch_lookup_tables("clients")
-    df_work_types = fetch_lookup_tables("work_types") # Corrected endpoint name
+    # The fetches are independent, so run them concurrently. Worker threads
+    # get the script context so st.error and the data cache work inside them.
+    lookup_names = ("clients", "work_types", "units", "verticals")
+    # Paging widgets live in the edit section; use their values from the last run
+    page_size = st.session_state.get("forecast_page_size", PAGE_SIZES[0])
+    # Stack of cursors for the visited pages; the last one is the current page
+    forecast_cursors = st.session_state.setdefault("forecast_cursors", [None])
+    client_filter = st.session_state.get("forecast_client_filter")
+    with ThreadPoolExecutor(
+        max_workers=len(lookup_names) + 2,
+        initializer=add_script_run_ctx,
+        initargs=(None, get_script_run_ctx())
+    ) as ex:
+        f_forecasts = ex.submit(fetch_all_forecasts, forecast_cursors[-1], page_size, client_filter)
+        f_stats = ex.submit(fetch_forecast_stats)
+        lookup_futures = {name: ex.submit(fetch_lookup_tables, name) for name in lookup_names}
+
+    df_forecasts = f_forecasts.result()
+    df_clients = lookup_futures["clients"].result()
+    df_work_types = lookup_futures["work_types"].result() # Corrected endpoint name
+    df_stats = f_stats.result()
     
     # These are now only needed for the charts, as lookups are in df_forecasts
-    df_business_units = fetch_lookup_tables("units")
-    df_business_verticals = fetch_lookup_tables("verticals")
+    df_business_units = lookup_futures["units"].result()
+    df_business_verticals = lookup_futures["verticals"].result()
 
-    if df_forecasts.empty:
+    if df_stats.empty:
         st.info("No forecast data found. Use the 'Add New Forecast' form to get started.")
     
     # --- 1. Basic Stats ---
-    if not df_forecasts.empty:
+    if not df_stats.empty:
         st.header("📈 Basic Stats")
         
-        # KPIs
-        total_forecast = df_forecasts['forecast_amount'].sum()
-        avg_forecast = df_forecasts['forecast_amount'].mean()
-        num_clients = df_forecasts['client_name'].nunique()
-        num_bus = df_forecasts['business_unit_name'].nunique()
-        num_bvs = df_forecasts['business_vertical_name'].nunique()
+        # Split the aggregated totals by dimension in a single pass
+        stats_by_dim = {
+            dimension: rows.set_index('name')['forecast_amount']
+            for dimension, rows in df_stats.groupby('dimension')
+        }
+        monthly_counts = df_stats.loc[df_stats['dimension'] == 'month', 'forecast_count']
+
+        # KPIs (from the aggregated totals, so they cover every forecast, not just this page)
+        total_forecast = stats_by_dim['month'].sum()
+        avg_forecast = total_forecast / monthly_counts.sum()
+        num_clients = len(stats_by_dim['client_name'])
+        num_bus = len(stats_by_dim['business_unit_name'])
+        num_bvs = len(stats_by_dim['business_vertical_name'])
         
         col1, col2, col3, col4, col5 = st.columns(5)
         col1.metric("Total Forecast Amount", f"${total_forecast:,.0f}")
@@ -94,47 +172,44 @@ def main():
         
         st.divider()
 
-        # Charts
+        # Charts (aggregated by the API)
         col1, col2 = st.columns(2)
         with col1:
             st.subheader("Forecast by Business Vertical")
-            bv_stats = df_forecasts.groupby('business_vertical_name')['forecast_amount'].sum()
-            st.bar_chart(bv_stats)
+            st.bar_chart(stats_by_dim['business_vertical_name'])
         
         with col2:
             st.subheader("Forecast by Business Unit")
-            bu_stats = df_forecasts.groupby('business_unit_name')['forecast_amount'].sum()
-            st.bar_chart(bu_stats)
+            st.bar_chart(stats_by_dim['business_unit_name'])
 
         col3, col4 = st.columns(2)
         with col3:
             st.subheader("Forecast by Client")
-            client_stats = df_forecasts.groupby('client_name')['forecast_amount'].sum()
-            st.bar_chart(client_stats)
+            st.bar_chart(stats_by_dim['client_name'])
         
         with col4:
             st.subheader("Forecast by Work Type")
-            work_type_stats = df_forecasts.groupby('work_type_name')['forecast_amount'].sum()
-            st.bar_chart(work_type_stats)
+            st.bar_chart(stats_by_dim['work_type_name'])
 
         st.subheader("Forecast Over Time")
-        time_stats = df_forecasts.copy()
-        time_stats['dt'] = pd.to_datetime(time_stats['dt'])
-        time_stats = time_stats.set_index('dt').resample('MS')['forecast_amount'].sum()
-        st.line_chart(time_stats)
+        time_stats = stats_by_dim['month'].copy()
+        time_stats.index = pd.to_datetime(time_stats.index)
+        # The API only returns months that have forecasts; chart the gaps as 0
+        all_months = pd.date_range(time_stats.index.min(), time_stats.index.max(), freq="MS")
+        st.line_chart(time_stats.sort_index().reindex(all_months, fill_value=0))
 
     # --- 2. Add New Forecast ---
     st.header("➕ Add New Forecast")
     
     # Create maps for easy lookup
-    client_map = dict(zip(df_clients['client_name'], df_clients['client_id']))
-    work_type_map = dict(zip(df_work_types['work_type_name'], df_work_types['work_type_id']))
+    client_map, client_options = build_option_map(df_clients, 'client_name', 'client_id')
+    work_type_map, work_type_options = build_option_map(df_work_types, 'work_type_name', 'work_type_id')
 
     with st.form("new_forecast_form", clear_on_submit=True):
         col1, col2 = st.columns(2)
         with col1:
-            client_name = st.selectbox("Client", options=sorted(client_map.keys()))
-            work_type_name = st.selectbox("Work Type", options=sorted(work_type_map.keys()))
+            client_name = st.selectbox("Client", options=client_options)
+            work_type_name = st.selectbox("Work Type", options=work_type_options)
         with col2:
             forecast_date = st.date_input("Forecast Date", datetime.date.today().replace(day=1))
             forecast_amount = st.number_input("Forecast Amount", min_value=0, step=100)
@@ -144,19 +219,10 @@ def main():
     if submitted:
         client_id = client_map[client_name]
         work_type_id = work_type_map[work_type_name]
-        
-        # Get the business_unit_id from the selected client
-        try:
-            client_row = df_clients[df_clients['client_id'] == client_id].iloc[0]
-            business_unit_id = int(client_row['business_unit_id'])
-        except Exception as e:
-            st.error(f"Could not find business unit for client {client_name}. Error: {e}")
-            st.stop()
 
-        # Create the payload for the API
+        # Create the payload for the API (it derives business_unit_id from the client)
         forecast_payload = {
             "client_id": client_id,
-            "business_unit_id": business_unit_id,
             "work_type_id": work_type_id,
             "dt": forecast_date.isoformat(),
             "forecast_amount": forecast_amount,
@@ -164,10 +230,10 @@ def main():
         }
 
         try:
-            response = requests.post(f"{API_URL}/forecasts/", json=forecast_payload)
+            response = SESSION.post(f"{API_URL}/forecasts/", json=forecast_payload)
             if response.status_code == 200:
                 st.success("New forecast added successfully!")
-                st.cache_data.clear() # Clear all data caches
+                clear_forecast_caches() # Lookup tables are unchanged
                 st.rerun()
             else:
                 handle_api_error(response, "add forecast")
@@ -176,6 +242,36 @@ def main():
 
     # --- 3. View & Edit Forecasts ---
     st.header("✏️ View & Edit Forecasts")
+
+    # Reuse the cached, already sorted client options instead of re-sorting here
+    client_names = {client_id: name for name, client_id in client_map.items()}
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        st.selectbox(
+            "Filter by Client",
+            options=[None] + [client_map[name] for name in client_options],
+            format_func=lambda id: "All Clients" if id is None else client_names.get(id, "Unknown"),
+            key="forecast_client_filter",
+            on_change=reset_forecast_page
+        )
+    with col2:
+        st.selectbox("Rows per page", options=PAGE_SIZES, key="forecast_page_size", on_change=reset_forecast_page)
+
+    col1, col2, col3 = st.columns([1, 1, 6])
+    col1.button(
+        "◀ Previous", 
+        on_click=previous_forecast_page, 
+        disabled=len(forecast_cursors) == 1, 
+        use_container_width=True
+    )
+    col2.button(
+        "Next ▶",
+        on_click=next_forecast_page,
+        args=(forecast_cursor(df_forecasts.iloc[-1]) if not df_forecasts.empty else None,),
+        disabled=len(df_forecasts) < page_size,
+        use_container_width=True
+    )
+    col3.caption(f"Page {len(forecast_cursors)}")
     
     if df_forecasts.empty:
         st.info("No data to display.")
@@ -210,53 +306,41 @@ def main():
         
         with col1:
             if st.button("💾 Save Changes", use_container_width=True):
-                comparison_df = df_forecasts.merge(
-                    edited_df,
-                    on=[
-                        'forecast_id', 'business_vertical_name', 'business_unit_name',
-                        'client_name', 'work_type_name', 'dt'
-                    ],
-                    how='outer',
-                    suffixes=('_orig', '_new'),
-                    indicator=True
-                )
+                # forecast_id uniquely identifies a row, so diff on the amounts alone
+                orig_amounts = df_forecasts.set_index('forecast_id')['forecast_amount']
+                new_amounts = edited_df.set_index('forecast_id')['forecast_amount']
 
                 # 1. Handle Updates (amount changed)
-                updates = comparison_df[
-                    (comparison_df['_merge'] == 'both') &
-                    (comparison_df['forecast_amount_orig'] != comparison_df['forecast_amount_new'])
+                common_ids = orig_amounts.index.intersection(new_amounts.index)
+                changed_mask = orig_amounts.loc[common_ids].to_numpy() != new_amounts.loc[common_ids].to_numpy()
+                changed_ids = common_ids[changed_mask]
+                update_payload = [
+                    {"forecast_id": int(forecast_id), "forecast_amount": int(amount)}
+                    for forecast_id, amount in zip(changed_ids, new_amounts.loc[changed_ids].to_numpy())
                 ]
-                
-                update_count = 0
-                for _, row in updates.iterrows():
-                    forecast_id = row['forecast_id']
-                    update_payload = {"forecast_amount": int(row['forecast_amount_new'])}
-                    try:
-                        response = requests.put(f"{API_URL}/forecasts/{forecast_id}", json=update_payload)
-                        if response.status_code == 200:
-                            update_count += 1
-                        else:
-                            handle_api_error(response, f"update forecast {forecast_id}")
-                    except requests.exceptions.RequestException as e:
-                        st.error(f"Error updating forecast {forecast_id}: {e}")
-                
+
                 # 2. Handle Deletions (row in original but not in edited)
-                deletions = comparison_df[comparison_df['_merge'] == 'left_only']
-                delete_count = 0
-                for _, row in deletions.iterrows():
-                    forecast_id = row['forecast_id']
+                deleted_ids = orig_amounts.index.difference(new_amounts.index)
+                delete_payload = [int(forecast_id) for forecast_id in deleted_ids]
+
+                # 3. Send everything in a single request
+                update_count, delete_count = 0, 0
+                if update_payload or delete_payload:
+                    bulk_payload = {"updates": update_payload, "deletes": delete_payload}
                     try:
-                        response = requests.delete(f"{API_URL}/forecasts/{forecast_id}")
+                        response = SESSION.post(f"{API_URL}/forecasts/bulk", json=bulk_payload)
                         if response.status_code == 200:
-                            delete_count += 1
+                            result = response.json()
+                            update_count = result["updated"]
+                            delete_count = result["deleted"]
                         else:
-                            handle_api_error(response, f"delete forecast {forecast_id}")
+                            handle_api_error(response, "save forecast changes")
                     except requests.exceptions.RequestException as e:
-                        st.error(f"Error deleting forecast {forecast_id}: {e}")
+                        st.error(f"Error saving forecast changes: {e}")
 
                 if update_count > 0 or delete_count > 0:
                     st.success(f"Successfully saved {update_count} update(s) and {delete_count} deletion(s)!")
-                    st.cache_data.clear() # Clear caches
+                    clear_forecast_caches()
                     st.rerun()
                 else:
                     st.info("No changes detected.")
@@ -1,18 +1,63 @@
-from psycopg2.extras import DictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 import schemas
 from datetime import date
 
-# Helper to convert DictRow to a Pydantic model
+# Statements prepared once per pooled connection (see database.prepare_connection)
+# for the hot single-row paths. Keys are statement names, values the PREPARE body.
+PREPARED_STATEMENTS = {
+    "get_client_by_id": "(int) AS SELECT * FROM clients WHERE client_id = $1",
+    "update_forecast_amount": "(int, int) AS UPDATE forecasts SET forecast_amount = $1 WHERE forecast_id = $2 RETURNING *",
+    "delete_forecast_by_id": "(int) AS DELETE FROM forecasts WHERE forecast_id = $1 RETURNING *",
+    "list_business_verticals": "(int, int) AS SELECT * FROM business_vertical LIMIT $1 OFFSET $2",
+    "list_business_units": "(int, int) AS SELECT * FROM business_unit LIMIT $1 OFFSET $2",
+    "list_clients": "(int, int) AS SELECT * FROM clients LIMIT $1 OFFSET $2",
+    "list_work_types": "(int, int) AS SELECT * FROM work_type LIMIT $1 OFFSET $2",
+    "list_work_type_origin_types": "(int, int) AS SELECT * FROM work_type_origin_type LIMIT $1 OFFSET $2",
+}
+
+# Helper to convert RealDictRow to a Pydantic model
 def model_from_dictrow(model_class, dict_row):
     if dict_row:
         # CONVERT TO DICT FIRST! This is the fix.
         return model_class(**dict(dict_row))
     return None
 
+def _bulk_modify(conn, table: str, id_column: str, columns: list[str], rows: list[tuple], deletes: list[int]):
+    """
+    Applies many deletions and updates to a lookup table in a single transaction.
+    Deletes run first so a row can be renamed to the name of one deleted in the
+    same save. `rows` are (id, *columns) tuples. Table and column names are
+    trusted constants.
+    Returns a tuple of (updated_count, deleted_count).
+    """
+    updated_count = 0
+    deleted_count = 0
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        if deletes:
+            cur.execute(f"DELETE FROM {table} WHERE {id_column} = ANY(%s)", (list(deletes),))
+            deleted_count = cur.rowcount
+        if rows:
+            assignments = ", ".join(f"{col} = v.{col}" for col in columns)
+            updated_rows = execute_values(
+                cur,
+                f"""
+                UPDATE {table}
+                SET {assignments}
+                FROM (VALUES %s) AS v({id_column}, {", ".join(columns)})
+                WHERE {table}.{id_column} = v.{id_column}
+                RETURNING {table}.{id_column}
+                """,
+                rows,
+                fetch=True
+            )
+            updated_count = len(updated_rows)
+        conn.commit()
+        return updated_count, deleted_count
+
 # --- Business Vertical CRUD ---
 
 def create_business_vertical(conn, vertical: schemas.BusinessVerticalCreate):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute(
             "INSERT INTO business_vertical (business_vertical_name) VALUES (%s) RETURNING *",
             (vertical.business_vertical_name,)
@@ -22,19 +67,19 @@ def create_business_vertical(conn, vertical: schemas.BusinessVerticalCreate):
         return new_vertical # Return raw data
 
 def get_business_vertical(conn, vertical_id: int):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute("SELECT * FROM business_vertical WHERE business_vertical_id = %s", (vertical_id,))
         vertical = cur.fetchone()
         return vertical # Return raw data
 
 def get_business_verticals(conn, skip: int = 0, limit: int = 100):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
-        cur.execute("SELECT * FROM business_vertical LIMIT %s OFFSET %s", (limit, skip))
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("EXECUTE list_business_verticals(%s, %s)", (limit, skip))
         verticals = cur.fetchall()
         return verticals # Return raw data
 
 def update_business_vertical(conn, vertical_id: int, vertical: schemas.BusinessVerticalCreate):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute(
             "UPDATE business_vertical SET business_vertical_name = %s WHERE business_vertical_id = %s RETURNING *",
             (vertical.business_vertical_name, vertical_id)
@@ -44,16 +89,22 @@ def update_business_vertical(conn, vertical_id: int, vertical: schemas.BusinessV
         return updated_vertical # Return raw data
 
 def delete_business_vertical(conn, vertical_id: int):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute("DELETE FROM business_vertical WHERE business_vertical_id = %s RETURNING *", (vertical_id,))
         deleted_vertical = cur.fetchone()
         conn.commit()
         return deleted_vertical # Return raw data
 
+def bulk_modify_business_verticals(conn, updates: list[schemas.BusinessVerticalUpdate], deletes: list[int]):
+    return _bulk_modify(
+        conn, "business_vertical", "business_vertical_id", ["business_vertical_name"],
+        [(v.business_vertical_id, v.business_vertical_name) for v in updates], deletes
+    )
+
 # --- Business Unit CRUD ---
 
 def create_business_unit(conn, unit: schemas.BusinessUnitCreate):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute(
             "INSERT INTO business_unit (business_unit_name, business_vertical_id) VALUES (%s, %s) RETURNING *",
             (unit.business_unit_name, unit.business_vertical_id)
@@ -63,19 +114,19 @@ def create_business_unit(conn, unit: schemas.BusinessUnitCreate):
         return new_unit # Return raw data
 
 def get_business_unit(conn, unit_id: int):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute("SELECT * FROM business_unit WHERE business_unit_id = %s", (unit_id,))
         unit = cur.fetchone()
         return unit # Return raw data
 
 def get_business_units(conn, skip: int = 0, limit: int = 100):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
-        cur.execute("SELECT * FROM business_unit LIMIT %s OFFSET %s", (limit, skip))
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("EXECUTE list_business_units(%s, %s)", (limit, skip))
         units = cur.fetchall()
         return units # Return raw data
 
 def update_business_unit(conn, unit_id: int, unit: schemas.BusinessUnitCreate):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute(
             "UPDATE business_unit SET business_unit_name = %s, business_vertical_id = %s WHERE business_unit_id = %s RETURNING *",
             (unit.business_unit_name, unit.business_vertical_id, unit_id)
@@ -85,16 +136,22 @@ def update_business_unit(conn, unit_id: int, unit: schemas.BusinessUnitCreate):
         return updated_unit # Return raw data
 
 def delete_business_unit(conn, unit_id: int):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute("DELETE FROM business_unit WHERE business_unit_id = %s RETURNING *", (unit_id,))
         deleted_unit = cur.fetchone()
         conn.commit()
         return deleted_unit # Return raw data
 
+def bulk_modify_business_units(conn, updates: list[schemas.BusinessUnitUpdate], deletes: list[int]):
+    return _bulk_modify(
+        conn, "business_unit", "business_unit_id", ["business_unit_name", "business_vertical_id"],
+        [(u.business_unit_id, u.business_unit_name, u.business_vertical_id) for u in updates], deletes
+    )
+
 # --- Client CRUD ---
 
 def create_client(conn, client: schemas.ClientCreate):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute(
             """
             INSERT INTO clients (client_name, client_active, client_start_date, client_end_date, business_unit_id)
@@ -108,19 +165,19 @@ def create_client(conn, client: schemas.ClientCreate):
         return new_client # Return raw data
 
 def get_client(conn, client_id: int):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
-        cur.execute("SELECT * FROM clients WHERE client_id = %s", (client_id,))
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("EXECUTE get_client_by_id(%s)", (client_id,))
         client = cur.fetchone()
         return client # Return raw data
 
 def get_clients(conn, skip: int = 0, limit: int = 100):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
-        cur.execute("SELECT * FROM clients LIMIT %s OFFSET %s", (limit, skip))
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("EXECUTE list_clients(%s, %s)", (limit, skip))
         clients = cur.fetchall()
         return clients # Return raw data
 
 def update_client(conn, client_id: int, client: schemas.ClientCreate):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute(
             """
             UPDATE clients
@@ -135,16 +192,77 @@ def update_client(conn, client_id: int, client: schemas.ClientCreate):
         return updated_client # Return raw data
 
 def delete_client(conn, client_id: int):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute("DELETE FROM clients WHERE client_id = %s RETURNING *", (client_id,))
         deleted_client = cur.fetchone()
         conn.commit()
         return deleted_client # Return raw data
 
+def _insert_clients(cur, clients: list[schemas.ClientCreate]):
+    """Inserts many clients with a single multi-row INSERT; the caller commits."""
+    return execute_values(
+        cur,
+        """
+        INSERT INTO clients (client_name, client_active, client_start_date, client_end_date, business_unit_id)
+        VALUES %s
+        RETURNING *
+        """,
+        [c.model_dump() for c in clients],
+        template=(
+            "(%(client_name)s, %(client_active)s, %(client_start_date)s,"
+            " %(client_end_date)s, %(business_unit_id)s)"
+        ),
+        fetch=True
+    )
+
+def bulk_modify_clients(
+    conn,
+    updates: list[schemas.ClientUpdate],
+    deletes: list[int],
+    creates: list[schemas.ClientCreate] = ()
+):
+    """
+    Applies many client deletions, updates and creations in a single transaction.
+    Deletes run first so a save can reuse a deleted client's name, whether by a
+    rename or a new row.
+    Returns a tuple of (updated_count, deleted_count, created_count).
+    """
+    updated_count = 0
+    deleted_count = 0
+    created_count = 0
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        if deletes:
+            cur.execute("DELETE FROM clients WHERE client_id = ANY(%s)", (list(deletes),))
+            deleted_count = cur.rowcount
+        if updates:
+            updated_rows = execute_values(
+                cur,
+                """
+                UPDATE clients
+                SET client_name = v.client_name, client_active = v.client_active,
+                    client_start_date = v.client_start_date, client_end_date = v.client_end_date,
+                    business_unit_id = v.business_unit_id
+                FROM (VALUES %s) AS v(client_id, client_name, client_active, client_start_date, client_end_date, business_unit_id)
+                WHERE clients.client_id = v.client_id
+                RETURNING clients.client_id
+                """,
+                [
+                    (c.client_id, c.client_name, c.client_active, c.client_start_date, c.client_end_date, c.business_unit_id)
+                    for c in updates
+                ],
+                template="(%s, %s, %s::boolean, %s::date, %s::date, %s)",
+                fetch=True
+            )
+            updated_count = len(updated_rows)
+        if creates:
+            created_count = len(_insert_clients(cur, creates))
+        conn.commit()
+        return updated_count, deleted_count, created_count
+
 # --- Work Type CRUD ---
 
 def create_work_type(conn, work_type: schemas.WorkTypeCreate):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute(
             "INSERT INTO work_type (work_type_name, work_type_origin_type_id) VALUES (%s, %s) RETURNING *",
             (work_type.work_type_name, work_type.work_type_origin_type_id)
@@ -154,19 +272,19 @@ def create_work_type(conn, work_type: schemas.WorkTypeCreate):
         return new_work_type # Return raw data
 
 def get_work_type(conn, work_type_id: int):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute("SELECT * FROM work_type WHERE work_type_id = %s", (work_type_id,))
         work_type = cur.fetchone()
         return work_type # Return raw data
 
 def get_work_types(conn, skip: int = 0, limit: int = 100):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
-        cur.execute("SELECT * FROM work_type LIMIT %s OFFSET %s", (limit, skip))
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("EXECUTE list_work_types(%s, %s)", (limit, skip))
         work_types = cur.fetchall()
         return work_types # Return raw data
 
 def update_work_type(conn, work_type_id: int, work_type: schemas.WorkTypeCreate):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute(
             "UPDATE work_type SET work_type_name = %s, work_type_origin_type_id = %s WHERE work_type_id = %s RETURNING *",
             (work_type.work_type_name, work_type.work_type_origin_type_id, work_type_id)
@@ -176,28 +294,34 @@ def update_work_type(conn, work_type_id: int, work_type: schemas.WorkTypeCreate)
         return updated_work_type
 
 def delete_work_type(conn, work_type_id: int):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute("DELETE FROM work_type WHERE work_type_id = %s RETURNING *", (work_type_id,))
         deleted_work_type = cur.fetchone()
         conn.commit()
         return deleted_work_type
 
+def bulk_modify_work_types(conn, updates: list[schemas.WorkTypeUpdate], deletes: list[int]):
+    return _bulk_modify(
+        conn, "work_type", "work_type_id", ["work_type_name", "work_type_origin_type_id"],
+        [(w.work_type_id, w.work_type_name, w.work_type_origin_type_id) for w in updates], deletes
+    )
+
 # --- Work Type Origin Type CRUD ---
 
 def get_work_type_origin_type(conn, origin_type_id: int):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute("SELECT * FROM work_type_origin_type WHERE work_type_origin_type_id = %s", (origin_type_id,))
         origin_type = cur.fetchone()
         return origin_type
 
 def get_work_type_origin_types(conn, skip: int = 0, limit: int = 100):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
-        cur.execute("SELECT * FROM work_type_origin_type LIMIT %s OFFSET %s", (limit, skip))
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("EXECUTE list_work_type_origin_types(%s, %s)", (limit, skip))
         origin_types = cur.fetchall()
         return origin_types
 
 def create_work_type_origin_type(conn, origin_type: schemas.WorkTypeOriginTypeCreate):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute(
             "INSERT INTO work_type_origin_type (work_type_origin_type_name) VALUES (%s) RETURNING *",
             (origin_type.work_type_origin_type_name,)
@@ -207,7 +331,7 @@ def create_work_type_origin_type(conn, origin_type: schemas.WorkTypeOriginTypeCr
         return new_origin_type
 
 def update_work_type_origin_type(conn, origin_type_id: int, origin_type: schemas.WorkTypeOriginTypeCreate):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute(
             "UPDATE work_type_origin_type SET work_type_origin_type_name = %s WHERE work_type_origin_type_id = %s RETURNING *",
             (origin_type.work_type_origin_type_name, origin_type_id)
@@ -217,19 +341,41 @@ def update_work_type_origin_type(conn, origin_type_id: int, origin_type: schemas
         return updated_origin_type
 
 def delete_work_type_origin_type(conn, origin_type_id: int):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute("DELETE FROM work_type_origin_type WHERE work_type_origin_type_id = %s RETURNING *", (origin_type_id,))
         deleted_origin_type = cur.fetchone()
         conn.commit()
         return deleted_origin_type
 
+def bulk_modify_work_type_origin_types(conn, updates: list[schemas.WorkTypeOriginTypeUpdate], deletes: list[int]):
+    return _bulk_modify(
+        conn, "work_type_origin_type", "work_type_origin_type_id", ["work_type_origin_type_name"],
+        [(o.work_type_origin_type_id, o.work_type_origin_type_name) for o in updates], deletes
+    )
+
 # --- Forecast CRUD ---
 
-def get_forecasts(conn, skip: int = 0, limit: int = 100):
+def _forecasts_query(after: tuple | None, limit: int, client_id: int | None):
     """
-    Fetches all forecasts with joined names for detailed view.
+    Builds the forecast detail query and its parameters.
+    Uses keyset pagination: `after` is the sort key of the last row of the
+    previous page, as (business_vertical_name, business_unit_name, client_name,
+    work_type_name, dt, forecast_id). Optionally restricted to a single client.
     """
-    query = """
+    conditions = []
+    params = []
+    if after is not None:
+        conditions.append(
+            "(bv.business_vertical_name, bu.business_unit_name, c.client_name, wt.work_type_name, f.dt, f.forecast_id)"
+            " > (%s, %s, %s, %s, %s, %s)"
+        )
+        params.extend(after)
+    if client_id is not None:
+        conditions.append("f.client_id = %s")
+        params.append(client_id)
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    params.append(limit)
+    query = f"""
     SELECT 
         f.forecast_id,
         bv.business_vertical_name,
@@ -248,40 +394,133 @@ def get_forecasts(conn, skip: int = 0, limit: int = 100):
         business_unit bu ON f.business_unit_id = bu.business_unit_id
     JOIN
         business_vertical bv ON bu.business_vertical_id = bv.business_vertical_id
+    {where_clause}
     ORDER BY
-        bv.business_vertical_name, bu.business_unit_name, c.client_name, wt.work_type_name, f.dt
-    LIMIT %s OFFSET %s;
+        bv.business_vertical_name, bu.business_unit_name, c.client_name, wt.work_type_name, f.dt, f.forecast_id
+    LIMIT %s;
+    """
+    return query, params
+
+def get_forecasts(conn, after: tuple | None = None, limit: int = 100, client_id: int | None = None):
     """
-    with conn.cursor(cursor_factory=DictCursor) as cur:
-        cur.execute(query, (limit, skip))
+    Fetches a page of forecasts with joined names for detailed view.
+    See `_forecasts_query` for the pagination parameters.
+    """
+    query, params = _forecasts_query(after, limit, client_id)
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(query, params)
         forecasts = cur.fetchall()
-        # We return the raw DictRow, main.py will parse into schema
+        # We return the raw RealDictRow, main.py will parse into schema
         return forecasts
 
+def iter_forecasts(conn, after: tuple | None = None, limit: int = 100, client_id: int | None = None, batch_size: int = 500):
+    """
+    Like `get_forecasts`, but reads through a server-side cursor and yields
+    the rows in batches, so a large page is never held in memory at once.
+    """
+    query, params = _forecasts_query(after, limit, client_id)
+    with conn.cursor(name="forecasts_stream", cursor_factory=RealDictCursor) as cur:
+        cur.itersize = batch_size
+        cur.execute(query, params)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+
+def get_forecast_stats(conn):
+    """
+    Aggregates forecast totals per vertical, unit, client, work type and month.
+    Each row is tagged with the dimension it belongs to.
+    """
+    query = """
+    SELECT 'business_vertical_name' AS dimension, bv.business_vertical_name AS name, SUM(f.forecast_amount) AS forecast_amount, COUNT(*) AS forecast_count
+    FROM forecasts f
+    JOIN business_unit bu ON f.business_unit_id = bu.business_unit_id
+    JOIN business_vertical bv ON bu.business_vertical_id = bv.business_vertical_id
+    GROUP BY bv.business_vertical_name
+    UNION ALL
+    SELECT 'business_unit_name', bu.business_unit_name, SUM(f.forecast_amount), COUNT(*)
+    FROM forecasts f
+    JOIN business_unit bu ON f.business_unit_id = bu.business_unit_id
+    GROUP BY bu.business_unit_name
+    UNION ALL
+    SELECT 'client_name', c.client_name, SUM(f.forecast_amount), COUNT(*)
+    FROM forecasts f
+    JOIN clients c ON f.client_id = c.client_id
+    GROUP BY c.client_name
+    UNION ALL
+    SELECT 'work_type_name', wt.work_type_name, SUM(f.forecast_amount), COUNT(*)
+    FROM forecasts f
+    JOIN work_type wt ON f.work_type_id = wt.work_type_id
+    GROUP BY wt.work_type_name
+    UNION ALL
+    SELECT 'month', to_char(date_trunc('month', f.dt), 'YYYY-MM-DD'), SUM(f.forecast_amount), COUNT(*)
+    FROM forecasts f
+    GROUP BY date_trunc('month', f.dt)
+    ORDER BY dimension, name;
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(query)
+        stats = cur.fetchall()
+        return stats
+
 def create_forecast(conn, forecast: schemas.ForecastCreate):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    """
+    Inserts a forecast, taking business_unit_id from the client when omitted.
+    Returns None if the client does not exist.
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute(
             """
             INSERT INTO forecasts (
                 client_id, business_unit_id, work_type_id, dt, 
                 forecast_amount, forecast_name
             )
-            VALUES (%s, %s, %s, %s, %s, %s)
+            SELECT c.client_id, COALESCE(%s, c.business_unit_id), %s, %s, %s, %s
+            FROM clients c
+            WHERE c.client_id = %s
             RETURNING *
             """,
             (
-                forecast.client_id, forecast.business_unit_id, forecast.work_type_id,
-                forecast.dt, forecast.forecast_amount, forecast.forecast_name
+                forecast.business_unit_id, forecast.work_type_id, forecast.dt,
+                forecast.forecast_amount, forecast.forecast_name, forecast.client_id
             )
         )
         new_forecast = cur.fetchone()
         conn.commit()
         return new_forecast # Return raw data
 
+def create_forecasts_bulk(conn, forecasts: list[schemas.ForecastCreate]):
+    """
+    Inserts many forecasts with a single multi-row INSERT and one commit.
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        new_forecasts = execute_values(
+            cur,
+            """
+            INSERT INTO forecasts (
+                client_id, business_unit_id, work_type_id, dt, 
+                forecast_amount, forecast_name
+            )
+            VALUES %s
+            RETURNING *
+            """,
+            [f.model_dump() for f in forecasts],
+            template=(
+                "(%(client_id)s,"
+                " COALESCE(%(business_unit_id)s, (SELECT business_unit_id FROM clients WHERE client_id = %(client_id)s)),"
+                " %(work_type_id)s, %(dt)s, %(forecast_amount)s, %(forecast_name)s)"
+            ),
+            fetch=True
+        )
+        conn.commit()
+        return new_forecasts # Return raw data
+
 def update_forecast_amount(conn, forecast_id: int, forecast_update: schemas.ForecastUpdate):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute(
-            "UPDATE forecasts SET forecast_amount = %s WHERE forecast_id = %s RETURNING *",
+            "EXECUTE update_forecast_amount(%s, %s)",
             (forecast_update.forecast_amount, forecast_id)
         )
         updated_forecast = cur.fetchone()
@@ -289,8 +528,35 @@ def update_forecast_amount(conn, forecast_id: int, forecast_update: schemas.Fore
         return updated_forecast # Return raw data
 
 def delete_forecast(conn, forecast_id: int):
-    with conn.cursor(cursor_factory=DictCursor) as cur:
-        cur.execute("DELETE FROM forecasts WHERE forecast_id = %s RETURNING *", (forecast_id,))
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("EXECUTE delete_forecast_by_id(%s)", (forecast_id,))
         deleted_forecast = cur.fetchone()
         conn.commit()
-        return deleted_forecast # Return raw data
\ No newline at end of file
+        return deleted_forecast # Return raw data
+
+def bulk_modify_forecasts(conn, updates: list[schemas.ForecastAmountUpdate], deletes: list[int]):
+    """
+    Applies many deletions and amount updates in a single transaction, deletes first.
+    Returns a tuple of (updated_count, deleted_count).
+    """
+    updated_count = 0
+    deleted_count = 0
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        if deletes:
+            cur.execute("DELETE FROM forecasts WHERE forecast_id = ANY(%s)", (list(deletes),))
+            deleted_count = cur.rowcount
+        if updates:
+            updated_rows = execute_values(
+                cur,
+                """
+                UPDATE forecasts SET forecast_amount = v.amount
+                FROM (VALUES %s) AS v(id, amount)
+                WHERE forecasts.forecast_id = v.id
+                RETURNING forecasts.forecast_id
+                """,
+                [(u.forecast_id, u.forecast_amount) for u in updates],
+                fetch=True
+            )
+            updated_count = len(updated_rows)
+        conn.commit()
+        return updated_count, deleted_count
@@ -1,21 +1,55 @@
+import os
+import time
+import weakref
 import psycopg2
 import toml
+from fastapi import HTTPException
+from psycopg2 import pool
 from psycopg2.pool import ThreadedConnectionPool
+import crud
 
 db_pool = None
+_prepared_conns = weakref.WeakSet() # Pooled connections that already ran PREPARE
+
+# Pool size per API worker; size the max to the worker's expected concurrency.
+# The min connections are opened at startup so early requests don't pay for setup.
+# psycopg2 closes any connection returned beyond minconn, so min defaults to max:
+# otherwise bursts would reconnect and re-run the PREPAREs on every checkout.
+POOL_MAX_SIZE = int(os.getenv("PG_POOL_SIZE", 25))
+POOL_MIN_SIZE = int(os.getenv("PG_POOL_MIN_SIZE", POOL_MAX_SIZE))
+
+# Seconds to wait for a free pooled connection before giving up
+POOL_TIMEOUT = 1.0
+
+# Checkouts slower than this (seconds) are logged as a sign the pool is too small
+SLOW_CHECKOUT_THRESHOLD = 0.05
+
+# Default connection settings: TCP keepalives so idle pooled connections survive
+# NAT/firewall timeouts, and a statement_timeout so a runaway query can't hold a
+# pooled connection indefinitely.
+STATEMENT_TIMEOUT_MS = int(os.getenv("PG_STATEMENT_TIMEOUT_MS", 10000))
+CONNECTION_DEFAULTS = {
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "options": f"-c statement_timeout={STATEMENT_TIMEOUT_MS}",
+}
+
+def load_db_config():
+    """Returns the connection settings: CONNECTION_DEFAULTS plus the [postgres] secrets."""
+    with open(".streamlit/secrets.toml", "r") as f:
+        secrets = toml.load(f)
+    return {**CONNECTION_DEFAULTS, **secrets["postgres"]}
 
 def init_db_pool():
     """Initializes the database connection pool."""
     global db_pool
     if db_pool is None:
         try:
-            with open(".streamlit/secrets.toml", "r") as f:
-                secrets = toml.load(f)
-            db_config = secrets["postgres"]
+            db_config = load_db_config()
             
             # Create a threaded connection pool
-            # minconn=1, maxconn=20
-            db_pool = ThreadedConnectionPool(1, 20, **db_config)
+            db_pool = ThreadedConnectionPool(POOL_MIN_SIZE, POOL_MAX_SIZE, **db_config)
             print("Database connection pool created.")
             
         except FileNotFoundError:
@@ -28,6 +62,28 @@ def init_db_pool():
             print(f"Error initializing database pool: {error}")
             exit(1)
 
+def prepare_connection(conn):
+    """Prepares the hot-path statements once per pooled connection."""
+    if conn in _prepared_conns:
+        return
+    with conn.cursor() as cur:
+        for name, statement in crud.PREPARED_STATEMENTS.items():
+            cur.execute(f"PREPARE {name} {statement}")
+    conn.commit()
+    _prepared_conns.add(conn)
+
+def acquire_conn(conn_pool=None):
+    """Gets a connection from the pool (the API's by default), retrying briefly if it is exhausted."""
+    conn_pool = conn_pool or db_pool
+    deadline = time.monotonic() + POOL_TIMEOUT
+    while True:
+        try:
+            return conn_pool.getconn()
+        except pool.PoolError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.01)
+
 def get_db_conn():
     """Yields a database connection from the pool."""
     if db_pool is None:
@@ -35,13 +91,29 @@ def get_db_conn():
         
     conn = None
     try:
-        conn = db_pool.getconn()
-        yield conn
+        started = time.monotonic()
+        conn = acquire_conn()
+        elapsed = time.monotonic() - started
+        if elapsed > SLOW_CHECKOUT_THRESHOLD:
+            print(f"Slow connection pool checkout: {elapsed * 1000:.0f} ms")
+        prepare_connection(conn)
     except (Exception, psycopg2.DatabaseError) as error:
         print(f"Error getting connection from pool: {error}")
-    finally:
         if conn:
-            db_pool.putconn(conn)
+            db_pool.putconn(conn, close=True)
+        raise HTTPException(status_code=503, detail="Database connection unavailable.") from error
+
+    broken = False
+    try:
+        yield conn
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        # The connection may be broken, so don't hand it to the next request.
+        # Other errors (e.g. constraint violations) leave it usable; the pool
+        # rolls back the failed transaction when it is returned.
+        broken = True
+        raise
+    finally:
+        db_pool.putconn(conn, close=broken or bool(conn.closed))
 
 def close_db_pool():
     """Closes all connections in the pool."""
@@ -1,22 +1,178 @@
+"""
+FastAPI endpoints for the forecast app.
+
+Rows returned by `crud` come straight from Postgres, whose column types and
+constraints already match the response schemas. The list routes encode them
+directly with orjson and return the bytes (see `_json_body`), skipping
+response-model validation entirely. Single-row routes still return models and
+go through FastAPI's usual response_model validation. Request bodies are
+validated by FastAPI as usual.
+"""
+import os
+from contextlib import contextmanager
+from itertools import chain
+import orjson
 import psycopg2
-from fastapi import FastAPI, Depends, HTTPException
+from anyio import to_thread
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from typing import List
+from datetime import date
 import schemas
 import crud
 import database
+import response_cache
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Level 1 is nearly free on CPU and still shrinks the repetitive list JSON a lot
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=1)
+
+def _from_row(model_class, row):
+    """
+    Wraps a database row in its response model without validating it here.
+    FastAPI still validates and serializes the result against the route's
+    response_model, so this only avoids a second validation pass, not the
+    first. Routes where that matters return pre-encoded JSON instead.
+    """
+    return model_class.model_construct(**row)
+
+def _json_body(body: bytes, response: Response | None = None):
+    """
+    Wraps already-encoded JSON in a response. The list routes return their
+    rows this way and declare no response_model, so FastAPI neither
+    re-validates nor re-serializes them; the schema is only documented via
+    `responses`. Headers set on the injected `response` (e.g. the ETag) are
+    carried over.
+    """
+    headers = dict(response.headers) if response is not None else None
+    return Response(body, media_type="application/json", headers=headers)
+
+def _not_modified(request: Request, response: Response, namespace, key):
+    """Tags a cached list response with its ETag; returns a 304 if the client already has it."""
+    etag = response_cache.etag(namespace, key)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
+
+# Pooled connection for routes that only need the database some of the time
+_db_connection = contextmanager(database.get_db_conn)
+
+def _cached_list(request: Request, response: Response, namespace, skip: int, limit: int, read_rows):
+    """
+    Serves a cached list route: a 304 when the client's ETag still matches,
+    else the cached body, else the rows from `read_rows`. A connection is only
+    checked out on a cache miss, so 304s and cache hits never wait on the pool.
+    """
+    key = (skip, limit)
+    not_modified = _not_modified(request, response, namespace, key)
+    if not_modified:
+        return not_modified
+    body = response_cache.get(namespace, key)
+    if body is None:
+        # Taken before the read so a write that lands mid-read can't be cached over
+        version = response_cache.version(namespace)
+        with _db_connection() as conn:
+            body = orjson.dumps(read_rows(conn, skip=skip, limit=limit))
+        response_cache.put(namespace, key, body, version)
+    return _json_body(body, response)
+
+# --- Database Error Handling ---
+
+# Messages for UNIQUE constraint violations, keyed by constraint name
+_UNIQUE_VIOLATION_MESSAGES = {
+    "business_vertical_business_vertical_name_key": "Business vertical name already exists.",
+    "business_unit_business_unit_name_key": "Business unit name already exists.",
+    "clients_client_name_key": "Client name already exists.",
+    "work_type_work_type_name_key": "Work type name already exists.",
+    "work_type_origin_type_work_type_origin_type_name_key": "Work type origin name already exists.",
+    "unique_forecast": "This forecast (client, BU, work type, date) already exists.",
+}
+
+# Messages for writing a row that points at a row that doesn't exist
+_MISSING_REFERENCE_MESSAGES = {
+    "business_unit_business_vertical_id_fkey": "Business vertical not found",
+    "work_type_work_type_origin_type_id_fkey": "Work type origin not found",
+    "clients_business_unit_id_fkey": "Business unit not found",
+    "forecasts_client_id_fkey": "Client not found",
+    "forecasts_business_unit_id_fkey": "Business unit not found",
+    "forecasts_work_type_id_fkey": "Work type not found",
+}
+
+# Messages for deleting a row that other rows still reference
+_STILL_REFERENCED_MESSAGES = {
+    "business_unit_business_vertical_id_fkey": "Cannot delete vertical, it is referenced by business units.",
+    "work_type_work_type_origin_type_id_fkey": "Cannot delete, it is referenced by work types.",
+    "clients_business_unit_id_fkey": "Cannot delete unit, it is referenced by clients.",
+    "forecasts_client_id_fkey": "Cannot delete client, it is referenced by forecasts.",
+    "forecasts_business_unit_id_fkey": "Cannot delete unit, it is referenced by forecasts.",
+    "forecasts_work_type_id_fkey": "Cannot delete work type, it is referenced by forecasts.",
+}
+
+# Table written by each top-level path, used to tell the two kinds of FK violation apart
+_RESOURCE_TABLES = {
+    "verticals": "business_vertical",
+    "units": "business_unit",
+    "clients": "clients",
+    "work_types": "work_type",
+    "work_type_origin_types": "work_type_origin_type",
+    "forecasts": "forecasts",
+}
+
+@app.exception_handler(psycopg2.errors.UniqueViolation)
+def unique_violation_handler(request: Request, exc: psycopg2.errors.UniqueViolation):
+    constraint = exc.diag.constraint_name
+    detail = _UNIQUE_VIOLATION_MESSAGES.get(constraint, f"Duplicate value violates {constraint}.")
+    return ORJSONResponse(status_code=400, content={"detail": detail})
+
+@app.exception_handler(psycopg2.errors.ForeignKeyViolation)
+def foreign_key_violation_handler(request: Request, exc: psycopg2.errors.ForeignKeyViolation):
+    # Postgres reports the referencing table either way: if that is the table this
+    # path writes, the new row points at a missing row; otherwise a delete hit a row
+    # that is still referenced elsewhere.
+    constraint = exc.diag.constraint_name
+    resource = request.url.path.strip("/").split("/")[0]
+    if exc.diag.table_name == _RESOURCE_TABLES.get(resource):
+        detail = _MISSING_REFERENCE_MESSAGES.get(constraint, f"Invalid foreign key: {constraint}")
+        return ORJSONResponse(status_code=404, content={"detail": detail})
+    detail = _STILL_REFERENCED_MESSAGES.get(constraint, f"Cannot delete, it is still referenced ({constraint}).")
+    return ORJSONResponse(status_code=400, content={"detail": detail})
+
+@app.exception_handler(psycopg2.errors.NotNullViolation)
+def not_null_violation_handler(request: Request, exc: psycopg2.errors.NotNullViolation):
+    # crud.create_forecasts_bulk derives business_unit_id from the client, so a NULL there
+    # means the client does not exist
+    if exc.diag.table_name == "forecasts" and exc.diag.column_name == "business_unit_id":
+        return ORJSONResponse(status_code=404, content={"detail": "Client not found"})
+    return ORJSONResponse(status_code=400, content={"detail": f"Missing value for {exc.diag.column_name}."})
 
 # --- Database Pool Lifecycle ---
 
+# Sync endpoints and the get_db_conn dependency run in anyio's worker threads,
+# which default to 40. Size the limit from the DB pool instead. At most
+# POOL_MAX_SIZE threads hold a connection; the list routes only check one out
+# on a cache miss, so the threads beyond that can serve their 304s and cache
+# hits while the others wait on the pool.
+THREADPOOL_SIZE = int(os.getenv("API_THREADPOOL_SIZE", database.POOL_MAX_SIZE * 2))
+
 @app.on_event("startup")
 def startup_event():
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
     database.init_db_pool()
 
 @app.on_event("shutdown")
 def shutdown_event():
     database.close_db_pool()
 
+# --- Health Check ---
+
+@app.api_route("/healthz", methods=["GET", "HEAD"], tags=["Health"])
+async def healthz():
+    """Lightweight liveness check for the Streamlit app."""
+    return {"ok": True}
+
 # --- Business Vertical Endpoints ---
 
 @app.post("/verticals/", response_model=schemas.BusinessVertical, tags=["Business Verticals"])
@@ -24,27 +180,32 @@ def create_vertical(
     vertical: schemas.BusinessVerticalCreate, 
     conn=Depends(database.get_db_conn)
 ):
-    try:
-        new_vertical = crud.create_business_vertical(conn=conn, vertical=vertical)
-        # Convert to dict for validation
-        return schemas.BusinessVertical.model_validate(dict(new_vertical))
-    except psycopg2.errors.UniqueViolation:
-        raise HTTPException(status_code=400, detail="Business vertical name already exists.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.get("/verticals/", response_model=List[schemas.BusinessVertical], tags=["Business Verticals"])
-def read_verticals(skip: int = 0, limit: int = 100, conn=Depends(database.get_db_conn)):
-    verticals_data = crud.get_business_verticals(conn, skip=skip, limit=limit)
-    # Convert each item to dict for validation
-    return [schemas.BusinessVertical.model_validate(dict(v)) for v in verticals_data]
+    new_vertical = crud.create_business_vertical(conn=conn, vertical=vertical)
+    response_cache.clear("verticals")
+    return _from_row(schemas.BusinessVertical, new_vertical)
+
+@app.post("/verticals/bulk", response_model=schemas.BulkResult, tags=["Business Verticals"])
+def bulk_modify_verticals(
+    bulk_op: schemas.BusinessVerticalBulkOp,
+    conn=Depends(database.get_db_conn)
+):
+    """
+    Apply many business vertical updates and deletions in one transaction.
+    """
+    updated, deleted = crud.bulk_modify_business_verticals(conn, bulk_op.updates, bulk_op.deletes)
+    response_cache.clear("verticals")
+    return schemas.BulkResult(updated=updated, deleted=deleted)
+
+@app.get("/verticals/", responses={200: {"model": List[schemas.BusinessVertical]}}, tags=["Business Verticals"])
+def read_verticals(request: Request, response: Response, skip: int = 0, limit: int = 100):
+    return _cached_list(request, response, "verticals", skip, limit, crud.get_business_verticals)
 
 @app.get("/verticals/{vertical_id}", response_model=schemas.BusinessVertical, tags=["Business Verticals"])
 def read_vertical(vertical_id: int, conn=Depends(database.get_db_conn)):
     db_vertical = crud.get_business_vertical(conn=conn, vertical_id=vertical_id)
     if db_vertical is None:
         raise HTTPException(status_code=404, detail="Business vertical not found")
-    return schemas.BusinessVertical.model_validate(dict(db_vertical))
+    return _from_row(schemas.BusinessVertical, db_vertical)
 
 @app.put("/verticals/{vertical_id}", response_model=schemas.BusinessVertical, tags=["Business Verticals"])
 def update_vertical(
@@ -52,23 +213,19 @@ def update_vertical(
     vertical: schemas.BusinessVerticalCreate, 
     conn=Depends(database.get_db_conn)
 ):
-    try:
-        updated_vertical = crud.update_business_vertical(conn, vertical_id, vertical)
-        if updated_vertical is None:
-            raise HTTPException(status_code=404, detail="Business vertical not found")
-        return schemas.BusinessVertical.model_validate(dict(updated_vertical))
-    except psycopg2.errors.UniqueViolation:
-        raise HTTPException(status_code=400, detail="Business vertical name already exists.")
+    updated_vertical = crud.update_business_vertical(conn, vertical_id, vertical)
+    response_cache.clear("verticals")
+    if updated_vertical is None:
+        raise HTTPException(status_code=404, detail="Business vertical not found")
+    return _from_row(schemas.BusinessVertical, updated_vertical)
 
 @app.delete("/verticals/{vertical_id}", response_model=schemas.BusinessVertical, tags=["Business Verticals"])
 def delete_vertical(vertical_id: int, conn=Depends(database.get_db_conn)):
-    try:
-        deleted_vertical = crud.delete_business_vertical(conn, vertical_id)
-        if deleted_vertical is None:
-            raise HTTPException(status_code=404, detail="Business vertical not found")
-        return schemas.BusinessVertical.model_validate(dict(deleted_vertical))
-    except psycopg2.errors.ForeignKeyViolation:
-        raise HTTPException(status_code=400, detail="Cannot delete vertical, it is referenced by business units.")
+    deleted_vertical = crud.delete_business_vertical(conn, vertical_id)
+    response_cache.clear("verticals")
+    if deleted_vertical is None:
+        raise HTTPException(status_code=404, detail="Business vertical not found")
+    return _from_row(schemas.BusinessVertical, deleted_vertical)
 
 # --- Business Unit Endpoints ---
 
@@ -77,27 +234,32 @@ def create_unit(
     unit: schemas.BusinessUnitCreate, 
     conn=Depends(database.get_db_conn)
 ):
-    try:
-        new_unit = crud.create_business_unit(conn=conn, unit=unit)
-        return schemas.BusinessUnit.model_validate(dict(new_unit))
-    except psycopg2.errors.UniqueViolation:
-        raise HTTPException(status_code=400, detail="Business unit name already exists.")
-    except psycopg2.errors.ForeignKeyViolation:
-        raise HTTPException(status_code=404, detail="Business vertical not found.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.get("/units/", response_model=List[schemas.BusinessUnit], tags=["Business Units"])
-def read_units(skip: int = 0, limit: int = 100, conn=Depends(database.get_db_conn)):
-    units_data = crud.get_business_units(conn, skip=skip, limit=limit)
-    return [schemas.BusinessUnit.model_validate(dict(u)) for u in units_data]
+    new_unit = crud.create_business_unit(conn=conn, unit=unit)
+    response_cache.clear("units")
+    return _from_row(schemas.BusinessUnit, new_unit)
+
+@app.post("/units/bulk", response_model=schemas.BulkResult, tags=["Business Units"])
+def bulk_modify_units(
+    bulk_op: schemas.BusinessUnitBulkOp,
+    conn=Depends(database.get_db_conn)
+):
+    """
+    Apply many business unit updates and deletions in one transaction.
+    """
+    updated, deleted = crud.bulk_modify_business_units(conn, bulk_op.updates, bulk_op.deletes)
+    response_cache.clear("units")
+    return schemas.BulkResult(updated=updated, deleted=deleted)
+
+@app.get("/units/", responses={200: {"model": List[schemas.BusinessUnit]}}, tags=["Business Units"])
+def read_units(request: Request, response: Response, skip: int = 0, limit: int = 100):
+    return _cached_list(request, response, "units", skip, limit, crud.get_business_units)
 
 @app.get("/units/{unit_id}", response_model=schemas.BusinessUnit, tags=["Business Units"])
 def read_unit(unit_id: int, conn=Depends(database.get_db_conn)):
     db_unit = crud.get_business_unit(conn=conn, unit_id=unit_id)
     if db_unit is None:
-        raise HTTPException(status_code=44, detail="Business unit not found")
-    return schemas.BusinessUnit.model_validate(dict(db_unit))
+        raise HTTPException(status_code=404, detail="Business unit not found")
+    return _from_row(schemas.BusinessUnit, db_unit)
 
 @app.put("/units/{unit_id}", response_model=schemas.BusinessUnit, tags=["Business Units"])
 def update_unit(
@@ -105,25 +267,19 @@ def update_unit(
     unit: schemas.BusinessUnitCreate, 
     conn=Depends(database.get_db_conn)
 ):
-    try:
-        updated_unit = crud.update_business_unit(conn, unit_id, unit)
-        if updated_unit is None:
-            raise HTTPException(status_code=404, detail="Business unit not found")
-        return schemas.BusinessUnit.model_validate(dict(updated_unit))
-    except psycopg2.errors.UniqueViolation:
-        raise HTTPException(status_code=400, detail="Business unit name already exists.")
-    except psycopg2.errors.ForeignKeyViolation:
-        raise HTTPException(status_code=404, detail="Business vertical not found.")
+    updated_unit = crud.update_business_unit(conn, unit_id, unit)
+    response_cache.clear("units")
+    if updated_unit is None:
+        raise HTTPException(status_code=404, detail="Business unit not found")
+    return _from_row(schemas.BusinessUnit, updated_unit)
 
 @app.delete("/units/{unit_id}", response_model=schemas.BusinessUnit, tags=["Business Units"])
 def delete_unit(unit_id: int, conn=Depends(database.get_db_conn)):
-    try:
-        deleted_unit = crud.delete_business_unit(conn, unit_id)
-        if deleted_unit is None:
-            raise HTTPException(status_code=404, detail="Business unit not found")
-        return schemas.BusinessUnit.model_validate(dict(deleted_unit))
-    except psycopg2.errors.ForeignKeyViolation:
-        raise HTTPException(status_code=400, detail="Cannot delete unit, it is referenced by clients.")
+    deleted_unit = crud.delete_business_unit(conn, unit_id)
+    response_cache.clear("units")
+    if deleted_unit is None:
+        raise HTTPException(status_code=404, detail="Business unit not found")
+    return _from_row(schemas.BusinessUnit, deleted_unit)
 
 # --- Client Endpoints ---
 
@@ -132,27 +288,34 @@ def create_client(
     client: schemas.ClientCreate, 
     conn=Depends(database.get_db_conn)
 ):
-    try:
-        new_client = crud.create_client(conn=conn, client=client)
-        return schemas.Client.model_validate(dict(new_client))
-    except psycopg2.errors.UniqueViolation:
-        raise HTTPException(status_code=400, detail="Client name already exists.")
-    except psycopg2.errors.ForeignKeyViolation:
-        raise HTTPException(status_code=404, detail="Business unit not found.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.get("/clients/", response_model=List[schemas.Client], tags=["Clients"])
-def read_clients(skip: int = 0, limit: int = 100, conn=Depends(database.get_db_conn)):
-    clients_data = crud.get_clients(conn, skip=skip, limit=limit)
-    return [schemas.Client.model_validate(dict(c)) for c in clients_data]
+    new_client = crud.create_client(conn=conn, client=client)
+    response_cache.clear("clients")
+    return _from_row(schemas.Client, new_client)
+
+@app.post("/clients/bulk", response_model=schemas.BulkResult, tags=["Clients"])
+def bulk_modify_clients(
+    bulk_op: schemas.ClientBulkOp,
+    conn=Depends(database.get_db_conn)
+):
+    """
+    Apply many client creations, updates and deletions in one transaction.
+    """
+    updated, deleted, created = crud.bulk_modify_clients(
+        conn, bulk_op.updates, bulk_op.deletes, bulk_op.creates
+    )
+    response_cache.clear("clients")
+    return schemas.BulkResult(updated=updated, deleted=deleted, created=created)
+
+@app.get("/clients/", responses={200: {"model": List[schemas.Client]}}, tags=["Clients"])
+def read_clients(request: Request, response: Response, skip: int = 0, limit: int = 100):
+    return _cached_list(request, response, "clients", skip, limit, crud.get_clients)
 
 @app.get("/clients/{client_id}", response_model=schemas.Client, tags=["Clients"])
 def read_client(client_id: int, conn=Depends(database.get_db_conn)):
     db_client = crud.get_client(conn=conn, client_id=client_id)
     if db_client is None:
         raise HTTPException(status_code=404, detail="Client not found")
-    return schemas.Client.model_validate(dict(db_client))
+    return _from_row(schemas.Client, db_client)
 
 @app.put("/clients/{client_id}", response_model=schemas.Client, tags=["Clients"])
 def update_client(
@@ -160,47 +323,46 @@ def update_client(
     client: schemas.ClientCreate, 
     conn=Depends(database.get_db_conn)
 ):
-    try:
-        updated_client = crud.update_client(conn, client_id, client)
-        if updated_client is None:
-            raise HTTPException(status_code=404, detail="Client not found")
-        return schemas.Client.model_validate(dict(updated_client))
-    except psycopg2.errors.UniqueViolation:
-        raise HTTPException(status_code=400, detail="Client name already exists.")
-    except psycopg2.errors.ForeignKeyViolation:
-        raise HTTPException(status_code=404, detail="Business unit not found.")
+    updated_client = crud.update_client(conn, client_id, client)
+    response_cache.clear("clients")
+    if updated_client is None:
+        raise HTTPException(status_code=404, detail="Client not found")
+    return _from_row(schemas.Client, updated_client)
 
 @app.delete("/clients/{client_id}", response_model=schemas.Client, tags=["Clients"])
 def delete_client(client_id: int, conn=Depends(database.get_db_conn)):
-    try:
-        deleted_client = crud.delete_client(conn, client_id)
-        if deleted_client is None:
-            raise HTTPException(status_code=44, detail="Client not found")
-        return schemas.Client.model_validate(dict(deleted_client))
-    except psycopg2.errors.ForeignKeyViolation:
-        raise HTTPException(status_code=400, detail="Cannot delete client, it is referenced by forecasts.")
+    deleted_client = crud.delete_client(conn, client_id)
+    response_cache.clear("clients")
+    if deleted_client is None:
+        raise HTTPException(status_code=404, detail="Client not found")
+    return _from_row(schemas.Client, deleted_client)
 
 # --- Work Type Endpoints ---
 
-@app.get("/work_types/", response_model=List[schemas.WorkType], tags=["Work Types"])
-def read_work_types(skip: int = 0, limit: int = 100, conn=Depends(database.get_db_conn)):
-    work_types_data = crud.get_work_types(conn, skip=skip, limit=limit)
-    return [schemas.WorkType.model_validate(dict(w)) for w in work_types_data]
+@app.get("/work_types/", responses={200: {"model": List[schemas.WorkType]}}, tags=["Work Types"])
+def read_work_types(request: Request, response: Response, skip: int = 0, limit: int = 100):
+    return _cached_list(request, response, "work_types", skip, limit, crud.get_work_types)
 
 @app.post("/work_types/", response_model=schemas.WorkType, tags=["Work Types"])
 def create_work_type(
     work_type: schemas.WorkTypeCreate, 
     conn=Depends(database.get_db_conn)
 ):
-    try:
-        new_work_type = crud.create_work_type(conn=conn, work_type=work_type)
-        return schemas.WorkType.model_validate(dict(new_work_type))
-    except psycopg2.errors.UniqueViolation:
-        raise HTTPException(status_code=400, detail="Work type name already exists.")
-    except psycopg2.errors.ForeignKeyViolation:
-        raise HTTPException(status_code=404, detail="Work type origin not found.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    new_work_type = crud.create_work_type(conn=conn, work_type=work_type)
+    response_cache.clear("work_types")
+    return _from_row(schemas.WorkType, new_work_type)
+
+@app.post("/work_types/bulk", response_model=schemas.BulkResult, tags=["Work Types"])
+def bulk_modify_work_types(
+    bulk_op: schemas.WorkTypeBulkOp,
+    conn=Depends(database.get_db_conn)
+):
+    """
+    Apply many work type updates and deletions in one transaction.
+    """
+    updated, deleted = crud.bulk_modify_work_types(conn, bulk_op.updates, bulk_op.deletes)
+    response_cache.clear("work_types")
+    return schemas.BulkResult(updated=updated, deleted=deleted)
 
 @app.put("/work_types/{work_type_id}", response_model=schemas.WorkType, tags=["Work Types"])
 def update_work_type(
@@ -208,45 +370,46 @@ def update_work_type(
     work_type: schemas.WorkTypeCreate, 
     conn=Depends(database.get_db_conn)
 ):
-    try:
-        updated_work_type = crud.update_work_type(conn, work_type_id, work_type)
-        if updated_work_type is None:
-            raise HTTPException(status_code=404, detail="Work type not found")
-        return schemas.WorkType.model_validate(dict(updated_work_type))
-    except psycopg2.errors.UniqueViolation:
-        raise HTTPException(status_code=400, detail="Work type name already exists.")
-    except psycopg2.errors.ForeignKeyViolation:
-        raise HTTPException(status_code=404, detail="Work type origin not found.")
+    updated_work_type = crud.update_work_type(conn, work_type_id, work_type)
+    response_cache.clear("work_types")
+    if updated_work_type is None:
+        raise HTTPException(status_code=404, detail="Work type not found")
+    return _from_row(schemas.WorkType, updated_work_type)
 
 @app.delete("/work_types/{work_type_id}", response_model=schemas.WorkType, tags=["Work Types"])
 def delete_work_type(work_type_id: int, conn=Depends(database.get_db_conn)):
-    try:
-        deleted_work_type = crud.delete_work_type(conn, work_type_id)
-        if deleted_work_type is None:
-            raise HTTPException(status_code=404, detail="Work type not found")
-        return schemas.WorkType.model_validate(dict(deleted_work_type))
-    except psycopg2.errors.ForeignKeyViolation:
-        raise HTTPException(status_code=400, detail="Cannot delete work type, it is referenced by forecasts.")
+    deleted_work_type = crud.delete_work_type(conn, work_type_id)
+    response_cache.clear("work_types")
+    if deleted_work_type is None:
+        raise HTTPException(status_code=404, detail="Work type not found")
+    return _from_row(schemas.WorkType, deleted_work_type)
 
 # --- Work Type Origin Type Endpoints ---
 
-@app.get("/work_type_origin_types/", response_model=List[schemas.WorkTypeOriginType], tags=["Work Type Origins"])
-def read_work_type_origin_types(skip: int = 0, limit: int = 100, conn=Depends(database.get_db_conn)):
-    origin_types = crud.get_work_type_origin_types(conn, skip=skip, limit=limit)
-    return [schemas.WorkTypeOriginType.model_validate(dict(o)) for o in origin_types]
+@app.get("/work_type_origin_types/", responses={200: {"model": List[schemas.WorkTypeOriginType]}}, tags=["Work Type Origins"])
+def read_work_type_origin_types(request: Request, response: Response, skip: int = 0, limit: int = 100):
+    return _cached_list(request, response, "work_type_origin_types", skip, limit, crud.get_work_type_origin_types)
 
 @app.post("/work_type_origin_types/", response_model=schemas.WorkTypeOriginType, tags=["Work Type Origins"])
 def create_work_type_origin_type(
     origin_type: schemas.WorkTypeOriginTypeCreate, 
     conn=Depends(database.get_db_conn)
 ):
-    try:
-        new_origin_type = crud.create_work_type_origin_type(conn=conn, origin_type=origin_type)
-        return schemas.WorkTypeOriginType.model_validate(dict(new_origin_type))
-    except psycopg2.errors.UniqueViolation:
-        raise HTTPException(status_code=400, detail="Work type origin name already exists.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    new_origin_type = crud.create_work_type_origin_type(conn=conn, origin_type=origin_type)
+    response_cache.clear("work_type_origin_types")
+    return _from_row(schemas.WorkTypeOriginType, new_origin_type)
+
+@app.post("/work_type_origin_types/bulk", response_model=schemas.BulkResult, tags=["Work Type Origins"])
+def bulk_modify_work_type_origin_types(
+    bulk_op: schemas.WorkTypeOriginTypeBulkOp,
+    conn=Depends(database.get_db_conn)
+):
+    """
+    Apply many origin type updates and deletions in one transaction.
+    """
+    updated, deleted = crud.bulk_modify_work_type_origin_types(conn, bulk_op.updates, bulk_op.deletes)
+    response_cache.clear("work_type_origin_types")
+    return schemas.BulkResult(updated=updated, deleted=deleted)
 
 @app.put("/work_type_origin_types/{origin_type_id}", response_model=schemas.WorkTypeOriginType, tags=["Work Type Origins"])
 def update_work_type_origin_type(
@@ -254,50 +417,106 @@ def update_work_type_origin_type(
     origin_type: schemas.WorkTypeOriginTypeCreate, 
     conn=Depends(database.get_db_conn)
 ):
-    try:
-        updated_origin_type = crud.update_work_type_origin_type(conn, origin_type_id, origin_type)
-        if updated_origin_type is None:
-            raise HTTPException(status_code=404, detail="Work type origin not found")
-        return schemas.WorkTypeOriginType.model_validate(dict(updated_origin_type))
-    except psycopg2.errors.UniqueViolation:
-        raise HTTPException(status_code=400, detail="Work type origin name already exists.")
+    updated_origin_type = crud.update_work_type_origin_type(conn, origin_type_id, origin_type)
+    response_cache.clear("work_type_origin_types")
+    if updated_origin_type is None:
+        raise HTTPException(status_code=404, detail="Work type origin not found")
+    return _from_row(schemas.WorkTypeOriginType, updated_origin_type)
 
 @app.delete("/work_type_origin_types/{origin_type_id}", response_model=schemas.WorkTypeOriginType, tags=["Work Type Origins"])
 def delete_work_type_origin_type(origin_type_id: int, conn=Depends(database.get_db_conn)):
-    try:
-        deleted_origin_type = crud.delete_work_type_origin_type(conn, origin_type_id)
-        if deleted_origin_type is None:
-            raise HTTPException(status_code=404, detail="Work type origin not found")
-        return schemas.WorkTypeOriginType.model_validate(dict(deleted_origin_type))
-    except psycopg2.errors.ForeignKeyViolation:
-        raise HTTPException(status_code=400, detail="Cannot delete, it is referenced by work types.")
+    deleted_origin_type = crud.delete_work_type_origin_type(conn, origin_type_id)
+    response_cache.clear("work_type_origin_types")
+    if deleted_origin_type is None:
+        raise HTTPException(status_code=404, detail="Work type origin not found")
+    return _from_row(schemas.WorkTypeOriginType, deleted_origin_type)
 
 
 # --- Forecast Endpoints ---
 
-@app.get("/forecasts/", response_model=List[schemas.ForecastDetail], tags=["Forecasts"])
-def read_forecasts(skip: int = 0, limit: int = 100, conn=Depends(database.get_db_conn)):
+# Pages at least this large are streamed from a server-side cursor, in batches
+# smaller than the threshold so a streamed page never arrives in one fetch
+STREAM_MIN_LIMIT = 1000
+
+# Largest page a client may request, so one request can't hold a cursor open indefinitely
+MAX_FORECAST_LIMIT = 10000
+
+def _stream_forecasts(batches):
+    """Streams row batches as a JSON array without building the whole body."""
+    # Run the query now so database errors still become a normal error response
+    first = next(batches, [])
+
+    def body():
+        # Close the cursor here even if the client disconnects mid-stream; left
+        # to garbage collection it would run CLOSE after the connection has gone
+        # back to the pool, possibly to another request.
+        try:
+            yield b"["
+            separator = b""
+            for rows in chain([first], batches) if first else ():
+                yield separator + b",".join(orjson.dumps(row) for row in rows)
+                separator = b","
+            yield b"]"
+        finally:
+            batches.close()
+
+    return StreamingResponse(body(), media_type="application/json")
+
+@app.get("/forecasts/", responses={200: {"model": List[schemas.ForecastDetail]}}, tags=["Forecasts"])
+def read_forecasts(
+    limit: int = Query(100, ge=1, le=MAX_FORECAST_LIMIT),
+    client_id: int | None = None, 
+    after_vertical: str | None = None,
+    after_unit: str | None = None,
+    after_client: str | None = None,
+    after_work_type: str | None = None,
+    after_dt: date | None = None,
+    after_id: int | None = None,
+    conn=Depends(database.get_db_conn)
+):
+    """
+    Get a page of forecasts with joined data for display, optionally for one client.
+    Pass the sort key of the last row already seen (the after_* params) to get the next page.
     """
-    Get all forecasts with joined data for display.
+    after = (after_vertical, after_unit, after_client, after_work_type, after_dt, after_id)
+    if all(v is None for v in after):
+        after = None
+    elif any(v is None for v in after):
+        raise HTTPException(status_code=400, detail="All after_* parameters must be given together.")
+    if limit >= STREAM_MIN_LIMIT:
+        batches = crud.iter_forecasts(conn, after=after, limit=limit, client_id=client_id, batch_size=STREAM_MIN_LIMIT // 2)
+        return _stream_forecasts(batches)
+    forecasts = crud.get_forecasts(conn, after=after, limit=limit, client_id=client_id)
+    return _json_body(orjson.dumps(forecasts))
+
+@app.get("/forecasts/stats/", response_model=List[schemas.ForecastStat], tags=["Forecasts"])
+def read_forecast_stats(conn=Depends(database.get_db_conn)):
     """
-    forecasts = crud.get_forecasts(conn, skip=skip, limit=limit)
-    # Parse raw dict rows into the detail schema
-    return [schemas.ForecastDetail.model_validate(dict(f)) for f in forecasts]
+    Get forecast totals pre-aggregated per vertical, unit, client, work type and month.
+    """
+    stats = crud.get_forecast_stats(conn)
+    return [_from_row(schemas.ForecastStat, s) for s in stats]
 
 @app.post("/forecasts/", response_model=schemas.Forecast, tags=["Forecasts"])
 def create_forecast(
     forecast: schemas.ForecastCreate, 
     conn=Depends(database.get_db_conn)
 ):
-    try:
-        new_forecast = crud.create_forecast(conn=conn, forecast=forecast)
-        return schemas.Forecast.model_validate(dict(new_forecast))
-    except psycopg2.errors.UniqueViolation:
-        raise HTTPException(status_code=400, detail="This forecast (client, BU, work type, date) already exists.")
-    except psycopg2.errors.ForeignKeyViolation as e:
-        raise HTTPException(status_code=404, detail=f"Invalid foreign key: {e.diag.constraint_name}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    new_forecast = crud.create_forecast(conn=conn, forecast=forecast)
+    if new_forecast is None:
+        raise HTTPException(status_code=404, detail="Client not found")
+    return _from_row(schemas.Forecast, new_forecast)
+
+@app.post("/forecasts/bulk", response_model=schemas.BulkResult, tags=["Forecasts"])
+def bulk_modify_forecasts(
+    bulk_op: schemas.ForecastBulkOp,
+    conn=Depends(database.get_db_conn)
+):
+    """
+    Apply many amount updates and deletions in one round-trip.
+    """
+    updated, deleted = crud.bulk_modify_forecasts(conn, bulk_op.updates, bulk_op.deletes)
+    return schemas.BulkResult(updated=updated, deleted=deleted)
 
 @app.put("/forecasts/{forecast_id}", response_model=schemas.Forecast, tags=["Forecasts"])
 def update_forecast(
@@ -311,11 +530,11 @@ def update_forecast(
     updated_forecast = crud.update_forecast_amount(conn, forecast_id, forecast_update)
     if updated_forecast is None:
         raise HTTPException(status_code=404, detail="Forecast not found")
-    return schemas.Forecast.model_validate(dict(updated_forecast))
+    return _from_row(schemas.Forecast, updated_forecast)
 
 @app.delete("/forecasts/{forecast_id}", response_model=schemas.Forecast, tags=["Forecasts"])
 def delete_forecast(forecast_id: int, conn=Depends(database.get_db_conn)):
     deleted_forecast = crud.delete_forecast(conn, forecast_id)
     if deleted_forecast is None:
         raise HTTPException(status_code=404, detail="Forecast not found")
-    return schemas.Forecast.model_validate(dict(deleted_forecast))
\ No newline at end of file
+    return _from_row(schemas.Forecast, deleted_forecast)
\ No newline at end of file
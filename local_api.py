@@ -0,0 +1,67 @@
+"""
+In-process reads of the API's data layer for the Streamlit pages.
+
+When the pages run on the same machine as the database, FX_API_IN_PROCESS=1
+makes their lookup table reads call `crud` directly instead of going through
+HTTP and JSON. Writes always go through the API, so they clear its response
+cache and ETags for every other reader.
+
+api_client only imports this module when the flag is set. The reads use their
+own small pool rather than the API's, which is sized for the API's workers.
+"""
+import threading
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+import crud
+import database
+
+# The pages read a handful of small lookup tables, so a couple of connections do
+POOL_MIN_SIZE = 1
+POOL_MAX_SIZE = 2
+
+class InProcessUnavailable(Exception):
+    """Raised when the in-process read pool can't be opened."""
+
+# Errors the in-process reads can raise: pool setup, checkout and the query itself
+ERRORS = (InProcessUnavailable, psycopg2.Error)
+
+_LIST_READERS = {
+    "verticals": crud.get_business_verticals,
+    "units": crud.get_business_units,
+    "clients": crud.get_clients,
+    "work_types": crud.get_work_types,
+    "work_type_origin_types": crud.get_work_type_origin_types,
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    """Opens the read pool on first use; a failure is raised and retried on the next read."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            try:
+                _pool = ThreadedConnectionPool(POOL_MIN_SIZE, POOL_MAX_SIZE, **database.load_db_config())
+            except FileNotFoundError as error:
+                raise InProcessUnavailable("'.streamlit/secrets.toml' not found.") from error
+            except KeyError as error:
+                raise InProcessUnavailable("'secrets.toml' is missing the [postgres] section.") from error
+            except psycopg2.Error as error:
+                raise InProcessUnavailable(f"Error opening the database pool: {error}") from error
+        return _pool
+
+def list_rows(endpoint_name, skip: int = 0, limit: int = 100):
+    """Returns the rows the GET /<endpoint_name>/ route would, as plain dicts."""
+    conn_pool = _get_pool()
+    conn = database.acquire_conn(conn_pool)
+    broken = False
+    try:
+        database.prepare_connection(conn)
+        return [dict(row) for row in _LIST_READERS[endpoint_name](conn, skip=skip, limit=limit)]
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        # Same rule as database.get_db_conn: don't reuse a possibly broken connection
+        broken = True
+        raise
+    finally:
+        conn_pool.putconn(conn, close=broken or bool(conn.closed))
@@ -2,38 +2,54 @@ import streamlit as st
 import pandas as pd
 import requests
 import datetime
-
-# --- API Configuration ---
-API_URL = "http://127.0.0.1:8000"
+from functools import partial
+from api_client import API_URL, SESSION, LOOKUP_TTL, handle_api_error, fetch_lookup_tables
 
 # --- API Helper Functions ---
 
-def handle_api_error(response, context="action"):
-    """Helper to display API errors in Streamlit."""
-    try:
-        detail = response.json().get("detail", response.text)
-    except requests.exceptions.JSONDecodeError:
-        detail = response.text
-    st.error(f"Failed to {context}: {response.status_code} - {detail}")
-
-@st.cache_data(ttl=5) # Short cache for editing pages
-def fetch_lookup_tables(endpoint_name):
-    """Fetches clients, work_type, etc. from the API."""
-    try:
-        response = requests.get(f"{API_URL}/{endpoint_name}/")
-        response.raise_for_status()
-        data = response.json()
-        df = pd.DataFrame(data)
-
-        # --- FIX: Convert date columns after fetching ---
-        if endpoint_name == "clients" and not df.empty:
-            df['client_start_date'] = pd.to_datetime(df['client_start_date']).dt.date
-            df['client_end_date'] = pd.to_datetime(df['client_end_date']).dt.date
-        
-        return df
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error fetching {endpoint_name}: {e}")
-        return pd.DataFrame()
+@st.cache_data(ttl=LOOKUP_TTL) # Expires with the units frame it is built from
+def build_unit_map(df_units):
+    """Builds the business_unit_id -> name map used by the unit select boxes."""
+    return dict(zip(df_units['business_unit_id'].tolist(), df_units['business_unit_name'].tolist()))
+
+def client_records(df):
+    """Maps client_id -> row dict, with NaT/NaN normalised to None so rows compare cleanly."""
+    return {
+        client_id: {col: (None if pd.isna(value) else value) for col, value in row.items()}
+        for client_id, row in df.to_dict(orient="index").items()
+    }
+
+def client_payloads(df):
+    """Converts edited client rows into JSON-ready dicts with ISO date strings."""
+    df = df.copy()
+    df['business_unit_id'] = df['business_unit_id'].astype(int)
+    df['client_active'] = df['client_active'].astype('boolean').fillna(True).astype(bool)
+    df['client_start_date'] = df['client_start_date'].dt.strftime('%Y-%m-%d')
+    end_dates = df['client_end_date']
+    df['client_end_date'] = end_dates.dt.strftime('%Y-%m-%d').astype(object).where(end_dates.notna(), None)
+    return df.to_dict(orient="records")
+
+def _fmt_unit(unit_map, unit_id):
+    """Select box label for a business unit id."""
+    return unit_map.get(unit_id, "Unknown")
+
+@st.cache_resource(show_spinner=False)
+def make_column_config(unit_map_tuple):
+    """Builds the client editor's column config once per distinct unit map."""
+    unit_map = dict(unit_map_tuple)
+    return {
+        "client_id": st.column_config.NumberColumn("ID", disabled=True),
+        "client_name": st.column_config.TextColumn("Client Name", required=True),
+        "client_active": st.column_config.CheckboxColumn("Active?"),
+        "client_start_date": st.column_config.DateColumn("Start Date", format="YYYY-MM-DD", required=True),
+        "client_end_date": st.column_config.DateColumn("End Date", format="YYYY-MM-DD"),
+        "business_unit_id": st.column_config.SelectboxColumn(
+            "Business Unit",
+            options=list(unit_map),
+            format_func=partial(_fmt_unit, unit_map),
+            required=True
+        )
+    }
 
 # --- Page ---
 
@@ -41,7 +57,7 @@ st.set_page_config(page_title="Client Config", page_icon="👥", layout="wide")
 st.title("👥 Client Configuration")
 
 # --- Load Data ---
-df_clients = fetch_lookup_tables("clients")
+df_clients = fetch_lookup_tables("clients", ("client_start_date", "client_end_date"))
 df_units = fetch_lookup_tables("units")
 
 if df_units.empty:
@@ -50,7 +66,8 @@ if df_units.empty:
 
 # --- 1. Add New Client ---
 st.header("➕ Add New Client")
-unit_map = dict(zip(df_units['business_unit_id'], df_units['business_unit_name']))
+unit_map = build_unit_map(df_units)
+unit_map_tuple = tuple(sorted(unit_map.items()))
 
 with st.form("new_client_form", clear_on_submit=True):
     col1, col2 = st.columns(2)
@@ -58,8 +75,8 @@ with st.form("new_client_form", clear_on_submit=True):
         client_name = st.text_input("Client Name")
         business_unit_id = st.selectbox(
             "Business Unit", 
-            options=unit_map.keys(), 
-            format_func=lambda id: unit_map.get(id, "Unknown")
+            options=list(unit_map), 
+            format_func=partial(_fmt_unit, unit_map)
         )
     with col2:
         client_start_date = st.date_input("Client Start Date", datetime.date.today())
@@ -79,7 +96,7 @@ if submitted:
             "client_end_date": None # Explicitly set end date to None on creation
         }
         try:
-            response = requests.post(f"{API_URL}/clients/", json=payload)
+            response = SESSION.post(f"{API_URL}/clients/", json=payload)
             if response.status_code == 200:
                 st.success(f"Client '{client_name}' added successfully!")
                 st.cache_data.clear()
@@ -103,19 +120,7 @@ else:
         key="client_editor",
         num_rows="dynamic",
         disabled=["client_id"],
-        column_config={
-            "client_id": st.column_config.NumberColumn("ID", disabled=True),
-            "client_name": st.column_config.TextColumn("Client Name", required=True),
-            "client_active": st.column_config.CheckboxColumn("Active?"),
-            "client_start_date": st.column_config.DateColumn("Start Date", format="YYYY-MM-DD", required=True),
-            "client_end_date": st.column_config.DateColumn("End Date", format="YYYY-MM-DD"),
-            "business_unit_id": st.column_config.SelectboxColumn(
-                "Business Unit",
-                options=unit_map.keys(),
-                format_func=lambda id: unit_map.get(id, "Unknown"),
-                required=True
-            )
-        },
+        column_config=make_column_config(unit_map_tuple),
         use_container_width=True
     )
 
@@ -124,61 +129,49 @@ else:
         original_df = df_clients.set_index('client_id')
         edited_df = client_editor_state.set_index('client_id')
         
-        update_count = 0
-        delete_count = 0
-        
-        # Find updates
-        # We use 'try...except' to catch rows that might be in one df but not the other
-        for client_id, row in edited_df.iterrows():
-            if client_id not in original_df.index:
-                # This is a new row added via the editor, but we prefer the "Add" form
-                st.warning(f"Row for {row['client_name']} was added in the editor. Please use the 'Add New Client' form.")
-                continue
-                
-            original_row = original_df.loc[client_id]
-            
-            # Convert to dicts for proper comparison
-            row_dict = row.to_dict()
-            original_row_dict = original_row.to_dict()
-
-            # Handle NaT/None comparison issues
-            if pd.isna(row_dict['client_end_date']): row_dict['client_end_date'] = None
-            if pd.isna(original_row_dict['client_end_date']): original_row_dict['client_end_date'] = None
-
-            if row_dict != original_row_dict:
-                # Row has changed
-                payload = row.to_dict()
-                # Convert date columns to ISO strings for JSON
-                payload['client_start_date'] = payload['client_start_date'].isoformat()
-                if pd.notna(payload['client_end_date']):
-                    payload['client_end_date'] = payload['client_end_date'].isoformat()
-                else:
-                    payload['client_end_date'] = None
-                
-                try:
-                    response = requests.put(f"{API_URL}/clients/{client_id}", json=payload)
-                    if response.status_code == 200:
-                        update_count += 1
-                    else:
-                        handle_api_error(response, f"update client {client_id}")
-                except requests.exceptions.RequestException as e:
-                    st.error(f"Error updating client {client_id}: {e}")
+        # Rows added in the editor are created in the same request
+        new_df = edited_df.loc[~edited_df.index.isin(original_df.index)].reset_index(drop=True)
+        incomplete = new_df[['client_name', 'client_start_date', 'business_unit_id']].isna().any(axis=1)
+        incomplete |= new_df['client_name'].fillna("").str.strip().eq("")
+        if incomplete.any():
+            st.warning(f"Skipped {int(incomplete.sum())} new row(s) missing a name, start date or business unit.")
+        creates = client_payloads(new_df.loc[~incomplete])
+
+        # Find updates with plain dict comparisons, one pass over the rows
+        orig = client_records(original_df)
+        edited = client_records(edited_df.loc[edited_df.index.notna()])
+        changed_ids = [cid for cid, row in edited.items() if cid in orig and row != orig[cid]]
+        changed_df = edited_df.loc[changed_ids].reset_index()
+        changed_df['client_id'] = changed_df['client_id'].astype(int)
+        updates = client_payloads(changed_df)
 
         # Find deletions
-        deleted_ids = set(original_df.index) - set(edited_df.index)
-        for client_id in deleted_ids:
+        deletes = [int(cid) for cid in orig.keys() - edited.keys()]
+
+        # Send everything in a single request
+        create_count, update_count, delete_count = 0, 0, 0
+        if creates or updates or deletes:
             try:
-                response = requests.delete(f"{API_URL}/clients/{client_id}")
+                response = SESSION.post(
+                    f"{API_URL}/clients/bulk",
+                    json={"creates": creates, "updates": updates, "deletes": deletes}
+                )
                 if response.status_code == 200:
-                    delete_count += 1
+                    result = response.json()
+                    create_count = result["created"]
+                    update_count = result["updated"]
+                    delete_count = result["deleted"]
                 else:
-                    handle_api_error(response, f"delete client {client_id}")
+                    handle_api_error(response, "save client changes")
             except requests.exceptions.RequestException as e:
-                st.error(f"Error deleting client {client_id}: {e}")
+                st.error(f"Error saving client changes: {e}")
 
-        if update_count > 0 or delete_count > 0:
-            st.success(f"Successfully saved {update_count} update(s) and {delete_count} deletion(s)!")
+        if create_count > 0 or update_count > 0 or delete_count > 0:
+            st.success(
+                f"Successfully saved {create_count} new client(s), {update_count} update(s) "
+                f"and {delete_count} deletion(s)!"
+            )
             st.cache_data.clear()
             st.rerun()
         else:
-            st.info("No changes detected.")
\ No newline at end of file
+            st.info("No changes detected.")
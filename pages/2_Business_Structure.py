@@ -1,45 +1,69 @@
 import streamlit as st
-import pandas as pd
 import requests
-
-# --- API Configuration ---
-API_URL = "http://127.0.0.1:8000"
-
-# --- API Helper Functions ---
-
-def handle_api_error(response, context="action"):
-    """Helper to display API errors in Streamlit."""
-    try:
-        detail = response.json().get("detail", response.text)
-    except requests.exceptions.JSONDecodeError:
-        detail = response.text
-    st.error(f"Failed to {context}: {response.status_code} - {detail}")
-
-@st.cache_data(ttl=5)
-def fetch_lookup_tables(endpoint_name):
-    """Fetches data from the API."""
-    try:
-        response = requests.get(f"{API_URL}/{endpoint_name}/")
-        response.raise_for_status()
-        data = response.json()
-        return pd.DataFrame(data)
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error fetching {endpoint_name}: {e}")
-        return pd.DataFrame()
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from api_client import (
+    API_URL, SESSION, handle_api_error, fetch_lookup_tables,
+    frames_unchanged, rows_by_id, save_bulk
+)
+
+# --- Lookup Maps ---
+
+@st.cache_resource(show_spinner=False)
+def build_vertical_map(ids: tuple, names: tuple):
+    """Builds the business_vertical_id -> name map; kept by reference, so don't mutate it."""
+    return dict(zip(ids, names))
+
+def _fmt_vertical(vertical_map, item_id):
+    """Select box label for a business vertical id."""
+    return vertical_map.get(item_id, "Unknown")
+
+# --- Column Configs ---
+
+@st.cache_resource(show_spinner=False)
+def make_vertical_columns():
+    """Builds the vertical editor's column config once."""
+    return {
+        "business_vertical_id": st.column_config.NumberColumn("ID", disabled=True),
+        "business_vertical_name": st.column_config.TextColumn("Vertical Name", required=True)
+    }
+
+@st.cache_resource(show_spinner=False)
+def make_unit_columns(vertical_ids: tuple, vertical_names: tuple):
+    """Builds the unit editor's column config once per distinct vertical map."""
+    vertical_map = build_vertical_map(vertical_ids, vertical_names)
+    return {
+        "business_unit_id": st.column_config.NumberColumn("ID", disabled=True),
+        "business_unit_name": st.column_config.TextColumn("Business Unit Name", required=True),
+        "business_vertical_id": st.column_config.SelectboxColumn(
+            "Business Vertical",
+            options=list(vertical_ids),
+            format_func=partial(_fmt_vertical, vertical_map),
+            required=True
+        )
+    }
 
 # --- Page ---
 st.set_page_config(page_title="Business Structure", page_icon="🏗️", layout="wide")
 st.title("🏗️ Business Structure")
 
 # --- Load Data ---
-df_verticals = fetch_lookup_tables("verticals")
-df_units = fetch_lookup_tables("units")
+# Fetch both tables concurrently; workers get the script context for st.error and the cache
+with ThreadPoolExecutor(
+    max_workers=2,
+    initializer=add_script_run_ctx,
+    initargs=(None, get_script_run_ctx())
+) as ex:
+    df_verticals, df_units = ex.map(fetch_lookup_tables, ["verticals", "units"])
 
 if df_verticals.empty:
     st.error("Failed to load Business Verticals. Is the API running?")
     # We can still proceed if units load, but the map will be empty
     
-vertical_map = dict(zip(df_verticals['business_vertical_id'], df_verticals['business_vertical_name']))
+vertical_ids = tuple(df_verticals['business_vertical_id'].tolist()) if not df_verticals.empty else ()
+vertical_names = tuple(df_verticals['business_vertical_name'].tolist()) if not df_verticals.empty else ()
+vertical_map = build_vertical_map(vertical_ids, vertical_names)
 
 # --- Tabs ---
 tab1, tab2 = st.tabs(["Business Verticals", "Business Units"])
@@ -56,7 +80,7 @@ with tab1:
             if submitted:
                 if vertical_name:
                     try:
-                        response = requests.post(f"{API_URL}/verticals/", json={"business_vertical_name": vertical_name})
+                        response = SESSION.post(f"{API_URL}/verticals/", json={"business_vertical_name": vertical_name})
                         if response.status_code == 200:
                             st.success(f"Vertical '{vertical_name}' added.")
                             st.cache_data.clear()
@@ -78,36 +102,32 @@ with tab1:
             key="vertical_editor",
             num_rows="dynamic",
             disabled=["business_vertical_id"],
-            column_config={
-                "business_vertical_id": st.column_config.NumberColumn("ID", disabled=True),
-                "business_vertical_name": st.column_config.TextColumn("Vertical Name", required=True)
-            },
+            column_config=make_vertical_columns(),
             use_container_width=True
         )
         
         if st.button("💾 Save Vertical Changes"):
             # Logic to save changes
-            original_df = df_verticals.set_index('business_vertical_id')
-            edited_df = edited_verticals.set_index('business_vertical_id')
-            
-            update_count, delete_count = 0, 0
-
-            # Updates
-            for id, row in edited_df.iterrows():
-                if id not in original_df.index: continue
-                original_row = original_df.loc[id]
-                if not row.equals(original_row):
-                    payload = row.to_dict()
-                    response = requests.put(f"{API_URL}/verticals/{id}", json=payload)
-                    if response.status_code == 200: update_count += 1
-                    else: handle_api_error(response, f"update vertical {id}")
-
-            # Deletions
-            deleted_ids = set(original_df.index) - set(edited_df.index)
-            for id in deleted_ids:
-                response = requests.delete(f"{API_URL}/verticals/{id}")
-                if response.status_code == 200: delete_count += 1
-                else: handle_api_error(response, f"delete vertical {id}")
+            if frames_unchanged(df_verticals, edited_verticals):
+                update_count, delete_count = 0, 0
+            else:
+                original_df = df_verticals.set_index('business_vertical_id')
+                edited_df = edited_verticals.set_index('business_vertical_id')
+
+                # Updates: plain tuple comparisons on rows present in both frames
+                orig_rows = rows_by_id(original_df)
+                edit_rows = rows_by_id(edited_df)
+                columns = edited_df.columns.tolist()
+                updates = [
+                    {"business_vertical_id": int(id), **dict(zip(columns, edit_rows[id]))}
+                    for id in edit_rows.keys() & orig_rows.keys()
+                    if edit_rows[id] != orig_rows[id]
+                ]
+
+                # Deletions
+                deletes = [int(id) for id in orig_rows.keys() - edit_rows.keys()]
+
+                update_count, delete_count = save_bulk("verticals", updates, deletes, "save vertical changes")
             
             if update_count > 0 or delete_count > 0:
                 st.success(f"Saved {update_count} update(s) and {delete_count} deletion(s).")
@@ -129,15 +149,15 @@ with tab2:
                 unit_name = st.text_input("Business Unit Name")
                 vertical_id = st.selectbox(
                     "Business Vertical", 
-                    options=vertical_map.keys(), 
-                    format_func=lambda id: vertical_map.get(id, "Unknown")
+                    options=list(vertical_ids), 
+                    format_func=partial(_fmt_vertical, vertical_map)
                 )
                 submitted = st.form_submit_button("Add Business Unit")
                 if submitted:
                     if unit_name:
                         payload = {"business_unit_name": unit_name, "business_vertical_id": vertical_id}
                         try:
-                            response = requests.post(f"{API_URL}/units/", json=payload)
+                            response = SESSION.post(f"{API_URL}/units/", json=payload)
                             if response.status_code == 200:
                                 st.success(f"Unit '{unit_name}' added.")
                                 st.cache_data.clear()
@@ -159,42 +179,32 @@ with tab2:
             key="unit_editor",
             num_rows="dynamic",
             disabled=["business_unit_id"],
-            column_config={
-                "business_unit_id": st.column_config.NumberColumn("ID", disabled=True),
-                "business_unit_name": st.column_config.TextColumn("Business Unit Name", required=True),
-                "business_vertical_id": st.column_config.SelectboxColumn(
-                    "Business Vertical",
-                    options=vertical_map.keys(),
-                    format_func=lambda id: vertical_map.get(id, "Unknown"),
-                    required=True
-                )
-            },
+            column_config=make_unit_columns(vertical_ids, vertical_names),
             use_container_width=True
         )
         
         if st.button("💾 Save Unit Changes"):
             # Logic to save changes
-            original_df = df_units.set_index('business_unit_id')
-            edited_df = edited_units.set_index('business_unit_id')
-            
-            update_count, delete_count = 0, 0
-
-            # Updates
-            for id, row in edited_df.iterrows():
-                if id not in original_df.index: continue
-                original_row = original_df.loc[id]
-                if not row.equals(original_row):
-                    payload = row.to_dict()
-                    response = requests.put(f"{API_URL}/units/{id}", json=payload)
-                    if response.status_code == 200: update_count += 1
-                    else: handle_api_error(response, f"update unit {id}")
-
-            # Deletions
-            deleted_ids = set(original_df.index) - set(edited_df.index)
-            for id in deleted_ids:
-                response = requests.delete(f"{API_URL}/units/{id}")
-                if response.status_code == 200: delete_count += 1
-                else: handle_api_error(response, f"delete unit {id}")
+            if frames_unchanged(df_units, edited_units):
+                update_count, delete_count = 0, 0
+            else:
+                original_df = df_units.set_index('business_unit_id')
+                edited_df = edited_units.set_index('business_unit_id')
+
+                # Updates: plain tuple comparisons on rows present in both frames
+                orig_rows = rows_by_id(original_df)
+                edit_rows = rows_by_id(edited_df)
+                columns = edited_df.columns.tolist()
+                updates = [
+                    {"business_unit_id": int(id), **dict(zip(columns, edit_rows[id]))}
+                    for id in edit_rows.keys() & orig_rows.keys()
+                    if edit_rows[id] != orig_rows[id]
+                ]
+
+                # Deletions
+                deletes = [int(id) for id in orig_rows.keys() - edit_rows.keys()]
+
+                update_count, delete_count = save_bulk("units", updates, deletes, "save unit changes")
             
             if update_count > 0 or delete_count > 0:
                 st.success(f"Saved {update_count} update(s) and {delete_count} deletion(s).")
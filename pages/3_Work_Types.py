@@ -1,45 +1,69 @@
 import streamlit as st
-import pandas as pd
 import requests
-
-# --- API Configuration ---
-API_URL = "http://127.0.0.1:8000"
-
-# --- API Helper Functions ---
-
-def handle_api_error(response, context="action"):
-    """Helper to display API errors in Streamlit."""
-    try:
-        detail = response.json().get("detail", response.text)
-    except requests.exceptions.JSONDecodeError:
-        detail = response.text
-    st.error(f"Failed to {context}: {response.status_code} - {detail}")
-
-@st.cache_data(ttl=5)
-def fetch_lookup_tables(endpoint_name):
-    """Fetches data from the API."""
-    try:
-        response = requests.get(f"{API_URL}/{endpoint_name}/")
-        response.raise_for_status()
-        data = response.json()
-        return pd.DataFrame(data)
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error fetching {endpoint_name}: {e}")
-        return pd.DataFrame()
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from api_client import (
+    API_URL, SESSION, handle_api_error, fetch_lookup_tables,
+    frames_unchanged, rows_by_id, save_bulk
+)
+
+# --- Lookup Maps ---
+
+@st.cache_resource(show_spinner=False)
+def build_origin_map(ids: tuple, names: tuple):
+    """Builds the work_type_origin_type_id -> name map; kept by reference, so don't mutate it."""
+    return dict(zip(ids, names))
+
+def _fmt_origin(origin_map, item_id):
+    """Select box label for a work type origin id."""
+    return origin_map.get(item_id, "Unknown")
+
+# --- Column Configs ---
+
+@st.cache_resource(show_spinner=False)
+def make_origin_columns():
+    """Builds the origin type editor's column config once."""
+    return {
+        "work_type_origin_type_id": st.column_config.NumberColumn("ID", disabled=True),
+        "work_type_origin_type_name": st.column_config.TextColumn("Origin Type Name", required=True),
+    }
+
+@st.cache_resource(show_spinner=False)
+def make_work_type_columns(origin_ids: tuple, origin_names: tuple):
+    """Builds the work type editor's column config once per distinct origin map."""
+    origin_map = build_origin_map(origin_ids, origin_names)
+    return {
+        "work_type_id": st.column_config.NumberColumn("ID", disabled=True),
+        "work_type_name": st.column_config.TextColumn("Work Type Name", required=True),
+        "work_type_origin_type_id": st.column_config.SelectboxColumn(
+            "Origin Type",
+            options=list(origin_ids),
+            format_func=partial(_fmt_origin, origin_map),
+            required=True
+        )
+    }
 
 # --- Page ---
 st.set_page_config(page_title="Work Type Config", page_icon="📝", layout="wide")
 st.title("📝 Work Type Configuration")
 
 # --- Load Data ---
-df_work_types = fetch_lookup_tables("work_types")
-df_origin_types = fetch_lookup_tables("work_type_origin_types")
+# Fetch both tables concurrently; workers get the script context for st.error and the cache
+with ThreadPoolExecutor(
+    max_workers=2,
+    initializer=add_script_run_ctx,
+    initargs=(None, get_script_run_ctx())
+) as ex:
+    df_work_types, df_origin_types = ex.map(fetch_lookup_tables, ["work_types", "work_type_origin_types"])
 
 if df_origin_types.empty:
     st.error("Failed to load Work Type Origins. Is the API running?")
     # We can still proceed, but the map will be empty
     
-origin_map = dict(zip(df_origin_types['work_type_origin_type_id'], df_origin_types['work_type_origin_type_name']))
+origin_ids = tuple(df_origin_types['work_type_origin_type_id'].tolist()) if not df_origin_types.empty else ()
+origin_names = tuple(df_origin_types['work_type_origin_type_name'].tolist()) if not df_origin_types.empty else ()
+origin_map = build_origin_map(origin_ids, origin_names)
 
 # --- Tabs ---
 tab1, tab2 = st.tabs(["Work Types", "Work Type Origins"])
@@ -57,15 +81,15 @@ with tab1:
                 work_type_name = st.text_input("Work Type Name")
                 origin_id = st.selectbox(
                     "Origin Type", 
-                    options=origin_map.keys(), 
-                    format_func=lambda id: origin_map.get(id, "Unknown")
+                    options=list(origin_ids), 
+                    format_func=partial(_fmt_origin, origin_map)
                 )
                 submitted = st.form_submit_button("Add Work Type")
                 if submitted:
                     if work_type_name:
                         payload = {"work_type_name": work_type_name, "work_type_origin_type_id": origin_id}
                         try:
-                            response = requests.post(f"{API_URL}/work_types/", json=payload)
+                            response = SESSION.post(f"{API_URL}/work_types/", json=payload)
                             if response.status_code == 200:
                                 st.success(f"Work Type '{work_type_name}' added.")
                                 st.cache_data.clear()
@@ -87,41 +111,31 @@ with tab1:
             key="work_type_editor",
             num_rows="dynamic",
             disabled=["work_type_id"],
-            column_config={
-                "work_type_id": st.column_config.NumberColumn("ID", disabled=True),
-                "work_type_name": st.column_config.TextColumn("Work Type Name", required=True),
-                "work_type_origin_type_id": st.column_config.SelectboxColumn(
-                    "Origin Type",
-                    options=origin_map.keys(),
-                    format_func=lambda id: origin_map.get(id, "Unknown"),
-                    required=True
-                )
-            },
+            column_config=make_work_type_columns(origin_ids, origin_names),
             use_container_width=True
         )
         
         if st.button("💾 Save Work Type Changes"):
-            original_df = df_work_types.set_index('work_type_id')
-            edited_df = edited_work_types.set_index('work_type_id')
-            
-            update_count, delete_count = 0, 0
-
-            # Updates
-            for id, row in edited_df.iterrows():
-                if id not in original_df.index: continue
-                original_row = original_df.loc[id]
-                if not row.equals(original_row):
-                    payload = row.to_dict()
-                    response = requests.put(f"{API_URL}/work_types/{id}", json=payload)
-                    if response.status_code == 200: update_count += 1
-                    else: handle_api_error(response, f"update work type {id}")
-
-            # Deletions
-            deleted_ids = set(original_df.index) - set(edited_df.index)
-            for id in deleted_ids:
-                response = requests.delete(f"{API_URL}/work_types/{id}")
-                if response.status_code == 200: delete_count += 1
-                else: handle_api_error(response, f"delete work type {id}")
+            if frames_unchanged(df_work_types, edited_work_types):
+                update_count, delete_count = 0, 0
+            else:
+                original_df = df_work_types.set_index('work_type_id')
+                edited_df = edited_work_types.set_index('work_type_id')
+
+                # Updates: plain tuple comparisons on rows present in both frames
+                orig_rows = rows_by_id(original_df)
+                edit_rows = rows_by_id(edited_df)
+                columns = edited_df.columns.tolist()
+                updates = [
+                    {"work_type_id": int(id), **dict(zip(columns, edit_rows[id]))}
+                    for id in edit_rows.keys() & orig_rows.keys()
+                    if edit_rows[id] != orig_rows[id]
+                ]
+
+                # Deletions
+                deletes = [int(id) for id in orig_rows.keys() - edit_rows.keys()]
+
+                update_count, delete_count = save_bulk("work_types", updates, deletes, "save work type changes")
             
             if update_count > 0 or delete_count > 0:
                 st.success(f"Saved {update_count} update(s) and {delete_count} deletion(s).")
@@ -143,7 +157,7 @@ with tab2:
                 if origin_name:
                     payload = {"work_type_origin_type_name": origin_name}
                     try:
-                        response = requests.post(f"{API_URL}/work_type_origin_types/", json=payload)
+                        response = SESSION.post(f"{API_URL}/work_type_origin_types/", json=payload)
                         if response.status_code == 200:
                             st.success(f"Origin Type '{origin_name}' added.")
                             st.cache_data.clear()
@@ -165,35 +179,31 @@ with tab2:
             key="origin_editor",
             num_rows="dynamic",
             disabled=["work_type_origin_type_id"],
-            column_config={
-                "work_type_origin_type_id": st.column_config.NumberColumn("ID", disabled=True),
-                "work_type_origin_type_name": st.column_config.TextColumn("Origin Type Name", required=True),
-            },
+            column_config=make_origin_columns(),
             use_container_width=True
         )
         
         if st.button("💾 Save Origin Type Changes"):
-            original_df = df_origin_types.set_index('work_type_origin_type_id')
-            edited_df = edited_origins.set_index('work_type_origin_type_id')
-            
-            update_count, delete_count = 0, 0
-
-            # Updates
-            for id, row in edited_df.iterrows():
-                if id not in original_df.index: continue
-                original_row = original_df.loc[id]
-                if not row.equals(original_row):
-                    payload = row.to_dict()
-                    response = requests.put(f"{API_URL}/work_type_origin_types/{id}", json=payload)
-                    if response.status_code == 200: update_count += 1
-                    else: handle_api_error(response, f"update origin type {id}")
-
-            # Deletions
-            deleted_ids = set(original_df.index) - set(edited_df.index)
-            for id in deleted_ids:
-                response = requests.delete(f"{API_URL}/work_type_origin_types/{id}")
-                if response.status_code == 200: delete_count += 1
-                else: handle_api_error(response, f"delete origin type {id}")
+            if frames_unchanged(df_origin_types, edited_origins):
+                update_count, delete_count = 0, 0
+            else:
+                original_df = df_origin_types.set_index('work_type_origin_type_id')
+                edited_df = edited_origins.set_index('work_type_origin_type_id')
+
+                # Updates: plain tuple comparisons on rows present in both frames
+                orig_rows = rows_by_id(original_df)
+                edit_rows = rows_by_id(edited_df)
+                columns = edited_df.columns.tolist()
+                updates = [
+                    {"work_type_origin_type_id": int(id), **dict(zip(columns, edit_rows[id]))}
+                    for id in edit_rows.keys() & orig_rows.keys()
+                    if edit_rows[id] != orig_rows[id]
+                ]
+
+                # Deletions
+                deletes = [int(id) for id in orig_rows.keys() - edit_rows.keys()]
+
+                update_count, delete_count = save_bulk("work_type_origin_types", updates, deletes, "save origin type changes")
             
             if update_count > 0 or delete_count > 0:
                 st.success(f"Saved {update_count} update(s) and {delete_count} deletion(s).")
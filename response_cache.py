@@ -0,0 +1,61 @@
+import threading
+import time
+
+# Seconds a cached list response stays valid. Mutating endpoints clear their
+# namespace explicitly, so this only bounds staleness across API workers.
+CACHE_TTL = 60
+
+_entries = {}
+_versions = {} # Bumped on every clear, used to build ETags
+_lock = threading.Lock()
+
+# Distinguishes this process's versions from those of a previous run
+_EPOCH = format(time.time_ns(), "x")
+
+def get(namespace, key):
+    """Returns the cached value for (namespace, key), or None if missing or expired."""
+    with _lock:
+        entry = _entries.get((namespace, key))
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del _entries[(namespace, key)]
+            return None
+        return value
+
+def version(namespace):
+    """Returns the namespace's current version; capture it before reading the rows to cache."""
+    with _lock:
+        return _versions.get(namespace, 0)
+
+def put(namespace, key, value, expected_version):
+    """
+    Caches a value under (namespace, key) for CACHE_TTL seconds, unless the
+    namespace was cleared since `expected_version` was taken: the value may
+    then predate that write, so it is dropped rather than served as current.
+    """
+    with _lock:
+        if _versions.get(namespace, 0) != expected_version:
+            return
+        _entries[(namespace, key)] = (time.monotonic() + CACHE_TTL, value)
+
+def etag(namespace, key):
+    """
+    Returns a weak ETag that changes whenever the namespace is cleared. It also
+    rolls over every CACHE_TTL seconds, bounding staleness across API workers,
+    whose versions are per process. A body cached just before a rollover can
+    be revalidated until the next one, so a client may see rows up to
+    2 * CACHE_TTL seconds old after a write on another worker.
+    """
+    with _lock:
+        version = _versions.get(namespace, 0)
+    window = int(time.time() // CACHE_TTL)
+    return f'W/"{_EPOCH}-{window}-{version}-{"-".join(map(str, key))}"'
+
+def clear(namespace):
+    """Drops every cached entry in a namespace, e.g. after a write to its table."""
+    with _lock:
+        _versions[namespace] = _versions.get(namespace, 0) + 1
+        for cache_key in [k for k in _entries if k[0] == namespace]:
+            del _entries[cache_key]
@@ -1,6 +1,14 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import date
 
+# --- Bulk Operation Schemas ---
+
+class BulkResult(BaseModel):
+    """Counts of rows affected by a bulk create/update/delete request."""
+    updated: int
+    deleted: int
+    created: int = 0
+
 # --- Business Vertical Schemas ---
 
 class BusinessVerticalBase(BaseModel):
@@ -12,8 +20,16 @@ class BusinessVerticalCreate(BusinessVerticalBase):
 class BusinessVertical(BusinessVerticalBase):
     business_vertical_id: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+class BusinessVerticalUpdate(BusinessVerticalBase):
+    """A single vertical change within a bulk request."""
+    business_vertical_id: int
+
+class BusinessVerticalBulkOp(BaseModel):
+    """Schema for applying many vertical updates and deletions in one request."""
+    updates: list[BusinessVerticalUpdate] = []
+    deletes: list[int] = []
 
 # --- Business Unit Schemas ---
 
@@ -27,8 +43,16 @@ class BusinessUnitCreate(BusinessUnitBase):
 class BusinessUnit(BusinessUnitBase):
     business_unit_id: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+class BusinessUnitUpdate(BusinessUnitBase):
+    """A single unit change within a bulk request."""
+    business_unit_id: int
+
+class BusinessUnitBulkOp(BaseModel):
+    """Schema for applying many unit updates and deletions in one request."""
+    updates: list[BusinessUnitUpdate] = []
+    deletes: list[int] = []
 
 # --- Client Schemas ---
 
@@ -45,8 +69,17 @@ class ClientCreate(ClientBase):
 class Client(ClientBase):
     client_id: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+class ClientUpdate(ClientBase):
+    """A single client change within a bulk client request."""
+    client_id: int
+
+class ClientBulkOp(BaseModel):
+    """Schema for applying many client creations, updates and deletions in one request."""
+    creates: list[ClientCreate] = []
+    updates: list[ClientUpdate] = []
+    deletes: list[int] = []
 
 # --- Work Type Origin Schemas ---
 
@@ -59,8 +92,16 @@ class WorkTypeOriginTypeCreate(WorkTypeOriginTypeBase):
 class WorkTypeOriginType(WorkTypeOriginTypeBase):
     work_type_origin_type_id: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+class WorkTypeOriginTypeUpdate(WorkTypeOriginTypeBase):
+    """A single origin type change within a bulk request."""
+    work_type_origin_type_id: int
+
+class WorkTypeOriginTypeBulkOp(BaseModel):
+    """Schema for applying many origin type updates and deletions in one request."""
+    updates: list[WorkTypeOriginTypeUpdate] = []
+    deletes: list[int] = []
 
 # --- Work Type Schemas ---
 
@@ -74,8 +115,16 @@ class WorkTypeCreate(WorkTypeBase):
 class WorkType(WorkTypeBase):
     work_type_id: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+class WorkTypeUpdate(WorkTypeBase):
+    """A single work type change within a bulk request."""
+    work_type_id: int
+
+class WorkTypeBulkOp(BaseModel):
+    """Schema for applying many work type updates and deletions in one request."""
+    updates: list[WorkTypeUpdate] = []
+    deletes: list[int] = []
 
 # --- Forecast Schemas ---
 
@@ -88,18 +137,28 @@ class ForecastBase(BaseModel):
     forecast_name: str | None = None
 
 class ForecastCreate(ForecastBase):
-    pass
+    # Derived from the client's business unit when omitted
+    business_unit_id: int | None = None
 
 class Forecast(ForecastBase):
     forecast_id: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ForecastUpdate(BaseModel):
     """Schema specifically for updating only the amount."""
     forecast_amount: int
 
+class ForecastAmountUpdate(BaseModel):
+    """A single amount change within a bulk forecast request."""
+    forecast_id: int
+    forecast_amount: int
+
+class ForecastBulkOp(BaseModel):
+    """Schema for applying many forecast updates and deletions in one request."""
+    updates: list[ForecastAmountUpdate] = []
+    deletes: list[int] = []
+
 class ForecastDetail(BaseModel):
     """Schema for returning joined forecast data."""
     forecast_id: int
@@ -110,5 +169,11 @@ class ForecastDetail(BaseModel):
     dt: date
     forecast_amount: int
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class ForecastStat(BaseModel):
+    """Schema for a pre-aggregated forecast total along one dimension."""
+    dimension: str
+    name: str
+    forecast_amount: int
+    forecast_count: int
@@ -1,3 +1,5 @@
+import csv
+import io
 import psycopg2
 import toml
 import datetime
@@ -71,58 +73,75 @@ CREATE TABLE forecasts (
 );
 
 CREATE INDEX idx_dt ON forecasts(dt);
-"""
-
-# --- SQL Commands to Insert Sample Data (Corrected and Expanded) ---
-INSERT_SAMPLE_DATA_SQL = """
--- 1. Populate tables with no dependencies
-INSERT INTO business_vertical (business_vertical_name) VALUES
-('Technology'),
-('Finance'),
-('Healthcare');
-
-INSERT INTO work_type_origin_type (work_type_origin_type_name) VALUES
-('Internal Project'),
-('Client Request');
-
--- 2. Populate tables with dependencies
-INSERT INTO business_unit (business_unit_name, business_vertical_id) VALUES
-('Consulting Services', 1),  -- Tech
-('Managed Services', 1),     -- Tech
-('Investment Banking', 2),   -- Finance
-('Data Science', 3);         -- Healthcare
 
-INSERT INTO work_type (work_type_name, work_type_origin_type_id) VALUES
-('Consulting', 2),
-('Development', 1),
-('Support', 2),
-('Data Analysis', 2);
-
--- 3. Populate clients
-INSERT INTO clients (client_name, client_active, client_start_date, business_unit_id) VALUES
-('Acme Corp', TRUE, '2023-01-01', 1),
-('Beta Industries', TRUE, '2024-05-15', 2),
-('Gamma Solutions', FALSE, '2022-03-10', 1);
-
--- 4. Populate forecasts
--- Sample data for Acme Corp (Client 1, BU 1)
-INSERT INTO forecasts (client_id, business_unit_id, work_type_id, dt, forecast_amount) VALUES
-(1, 1, 1, '2025-11-01', 10000),
-(1, 1, 1, '2025-12-01', 12000),
-(1, 1, 1, '2026-01-01', 11000),
-(1, 1, 2, '2025-11-01', 25000),
-(1, 1, 2, '2025-12-01', 22000),
-(1, 1, 2, '2026-01-01', 27000);
-
--- Sample data for Beta Industries (Client 2, BU 2)
-INSERT INTO forecasts (client_id, business_unit_id, work_type_id, dt, forecast_amount) VALUES
-(2, 2, 3, '2025-11-01', 5000),
-(2, 2, 3, '2025-12-01', 5000),
-(2, 2, 3, '2026-01-01', 5500),
-(2, 2, 4, '2025-11-01', 8000),
-(2, 2, 4, '2025-12-01', 9000);
+-- Foreign key indexes so the forecast detail JOINs can use index lookups.
+-- business_unit_id needs none: unique_forecast already leads with it.
+-- The client index also serves the client_id filter and FK checks on client deletes.
+CREATE INDEX idx_forecasts_client ON forecasts(client_id);
+CREATE INDEX idx_forecasts_wt ON forecasts(work_type_id);
+CREATE INDEX idx_bu_bv ON business_unit(business_vertical_id);
+-- No (client, unit, work type) index for bulk writes: they update and delete
+-- forecasts by primary key, and unique_forecast already serves lookups on
+-- (business_unit_id, client_id, work_type_id) as its leading columns.
 """
 
+# --- Sample Data, loaded with COPY (in dependency order) ---
+# Each entry is (table, columns, rows); ids come from the SERIAL columns in insert order.
+SAMPLE_DATA = [
+    # 1. Tables with no dependencies
+    ("business_vertical", ("business_vertical_name",), [
+        ("Technology",),
+        ("Finance",),
+        ("Healthcare",),
+    ]),
+    ("work_type_origin_type", ("work_type_origin_type_name",), [
+        ("Internal Project",),
+        ("Client Request",),
+    ]),
+    # 2. Tables with dependencies
+    ("business_unit", ("business_unit_name", "business_vertical_id"), [
+        ("Consulting Services", 1),  # Tech
+        ("Managed Services", 1),     # Tech
+        ("Investment Banking", 2),   # Finance
+        ("Data Science", 3),         # Healthcare
+    ]),
+    ("work_type", ("work_type_name", "work_type_origin_type_id"), [
+        ("Consulting", 2),
+        ("Development", 1),
+        ("Support", 2),
+        ("Data Analysis", 2),
+    ]),
+    # 3. Clients
+    ("clients", ("client_name", "client_active", "client_start_date", "business_unit_id"), [
+        ("Acme Corp", True, "2023-01-01", 1),
+        ("Beta Industries", True, "2024-05-15", 2),
+        ("Gamma Solutions", False, "2022-03-10", 1),
+    ]),
+    # 4. Forecasts
+    ("forecasts", ("client_id", "business_unit_id", "work_type_id", "dt", "forecast_amount"), [
+        # Acme Corp (Client 1, BU 1)
+        (1, 1, 1, "2025-11-01", 10000),
+        (1, 1, 1, "2025-12-01", 12000),
+        (1, 1, 1, "2026-01-01", 11000),
+        (1, 1, 2, "2025-11-01", 25000),
+        (1, 1, 2, "2025-12-01", 22000),
+        (1, 1, 2, "2026-01-01", 27000),
+        # Beta Industries (Client 2, BU 2)
+        (2, 2, 3, "2025-11-01", 5000),
+        (2, 2, 3, "2025-12-01", 5000),
+        (2, 2, 3, "2026-01-01", 5500),
+        (2, 2, 4, "2025-11-01", 8000),
+        (2, 2, 4, "2025-12-01", 9000),
+    ]),
+]
+
+def copy_rows(cur, table, columns, rows):
+    """Streams rows into a table with a single COPY ... FROM STDIN (CSV)."""
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    buf.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buf)
+
 def setup_database():
     """Connects to Postgres, drops old tables, creates new ones, and inserts sample data."""
     conn = None
@@ -137,7 +156,8 @@ def setup_database():
             
             # Insert sample data
             print("Inserting sample data...")
-            cur.execute(INSERT_SAMPLE_DATA_SQL)
+            for table, columns, rows in SAMPLE_DATA:
+                copy_rows(cur, table, columns, rows)
             print("Sample data inserted.")
         
         # Commit the transaction